@@ -0,0 +1,113 @@
+"""
+Benchmark del camino async hacia la base de datos.
+Simula N workers de ingesta guardando mensaje + reserva + notificación contra
+una SQLite temporal y compara llamar a los servicios síncronos directamente
+desde el event loop (comportamiento anterior) con delegarlos a run_db.
+
+Muestra mensajes/segundo y el mayor retraso observado por una tarea "latido"
+que debería despertar cada 5 ms: con llamadas inline el loop queda bloqueado
+durante cada commit.
+
+--commit-latency añade una espera tras cada commit para simular la latencia de
+una BD remota (RTT), que los threads pueden solapar. Con --latency-in-lock la
+espera ocurre dentro del commit, con el lock de escritura de SQLite tomado: los
+escritores se serializan y el rendimiento no escala con ningún modo, pero el
+loop sigue respondiendo con run_db.
+
+Uso:
+    python benchmarks/db_concurrency.py --messages 400 --commit-latency 0.01
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--messages", type=int, default=400)
+parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+parser.add_argument("--threads", type=int, default=8, help="DB_THREADS del pool de run_db")
+parser.add_argument("--commit-latency", type=float, default=0.01, help="segundos extra por commit")
+parser.add_argument("--latency-in-lock", action="store_true", help="esperar dentro del commit (fsync lento)")
+args = parser.parse_args()
+os.environ["DB_THREADS"] = str(args.threads)
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from database.database import Base, run_db
+from database.models import Platform
+from services.message_history_service import MessageHistoryService
+from services.notification_service import NotificationService
+from services.reservation_service import ReservationService
+
+
+def make_session_factory(path: str, commit_latency: float, in_lock: bool):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    if commit_latency and in_lock:
+        event.listen(engine, "commit", lambda conn: time.sleep(commit_latency))
+    elif commit_latency:
+        event.listen(factory, "after_commit", lambda session: time.sleep(commit_latency))
+    return factory
+
+
+def handle_message(db, i: int):
+    MessageHistoryService.save_message(db, Platform.WHATSAPP, f"c{i}", f"reserva para 2 #{i}")
+    reservation = ReservationService.create_reservation(db, Platform.WHATSAPP, f"c{i}", party_size=2)
+    NotificationService.create_notification(db, f"Nueva reserva #{i}", reservation.id)
+
+
+async def run(session_factory, offload: bool, messages: int, concurrency: int):
+    queue = asyncio.Queue()
+    for i in range(messages):
+        queue.put_nowait(i)
+    max_lag = 0.0
+    done = False
+
+    async def heartbeat():
+        nonlocal max_lag
+        while not done:
+            expected = time.perf_counter() + 0.005
+            await asyncio.sleep(0.005)
+            max_lag = max(max_lag, time.perf_counter() - expected)
+
+    async def worker():
+        while not queue.empty():
+            i = queue.get_nowait()
+            db = session_factory()
+            if offload:
+                try:
+                    await run_db(handle_message, db, i)
+                finally:
+                    await run_db(db.close)
+            else:
+                try:
+                    handle_message(db, i)
+                finally:
+                    db.close()
+                await asyncio.sleep(0)  # punto de cesión, como en el handler real
+
+    beat = asyncio.create_task(heartbeat())
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    done = True
+    await beat
+    return messages / elapsed, max_lag * 1000
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'modo':<10}{'concurrencia':>14}{'mensajes/s':>14}{'lag máx (ms)':>16}")
+        for concurrency in args.concurrency:
+            for offload in (False, True):
+                path = os.path.join(tmp, f"bench-{concurrency}-{int(offload)}.db")
+                session_factory = make_session_factory(path, args.commit_latency, args.latency_in_lock)
+                rate, lag = asyncio.run(run(session_factory, offload, args.messages, concurrency))
+                mode = "run_db" if offload else "inline"
+                print(f"{mode:<10}{concurrency:>14}{rate:>14,.0f}{lag:>16,.1f}")
@@ -0,0 +1,187 @@
+"""
+Microbenchmark del extractor de entidades.
+Compara el extractor anterior (un re.search por patrón y por método) con el
+escaneo compilado de EntityExtractor y muestra extracciones/segundo.
+
+Antes de medir verifica que ambos den el mismo resultado sobre GOLDEN_CORPUS;
+si alguna frase difiere, el script termina con error.
+
+Uso:
+    python benchmarks/entity_extractor.py --messages 100000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.entity_extractor import EntityExtractor
+from utils.logger import app_logger
+
+GOLDEN_CORPUS = [
+    "Quiero hacer una reserva para 4 personas mañana a las 21:00",
+    "Somos 6, ¿hay mesa para esta noche a las 9pm?",
+    "mesa para 2 hoy 20:30",
+    "Reserva para 3 comensales el 15/01/2026 a las 8 de la noche",
+    "Hola, somos 12 para el sábado 7 de la tarde",
+    "Una mesa para 8 pasado mañana",
+    "Reserva pasado a las 13:15 para 5",
+    "para 99, mesa para 4 personas",
+    "para 100 personas mesa para 4",
+    "somos 60 pero mesa para 10",
+    "RESERVA PARA 4 PERSONAS HOY 10AM",
+    "reserva a las 12am",
+    "reserva a las 12pm",
+    "reserva a las 120pm",
+    "reserva a las 25:00 o 9 de la mañana",
+    "reserva 123:45",
+    "reserva 9:75 o a las 7 pm",
+    "reserva 8 am, aunque tal vez 8 pm",
+    "reserva el 31-02-2026 para 2",
+    "reserva el 1/3/2026 para 2 personas",
+    "reserva 10 de la mañana 05/05/2027",
+    "reserva 11 de la noche",
+    "reserva para 1 persona",
+    "reserva para 0 personas, somos 3",
+    "quiero una mesa",
+    "Ahoy, una mesa para 2",
+    "reservar turno 2personas 21:00hs",
+    "cita para4 a las 8pm",
+    "separa 4 lugares",
+    "mesa para 9 y otra de 3 personas",
+    "reserva 25:30pm",
+    "reserva para 123:45",
+    "el 1/123/2026 o el 123/4/2026",
+    "somos 2 y para 100 comensales",
+    "mesa para 70, somos 5",
+    "",
+]
+
+
+# --- Implementación anterior, copiada tal cual para comparar ---
+
+LEGACY_PARTY_SIZE_PATTERNS = [
+    r'(\d+)\s*personas?',
+    r'para\s*(\d+)',
+    r'somos\s*(\d+)',
+    r'mesa\s*para\s*(\d+)',
+    r'(\d+)\s*comensales?'
+]
+
+LEGACY_DATE_KEYWORDS = {'hoy': 0, 'mañana': 1, 'pasado mañana': 2, 'pasado': 2}
+
+
+def legacy_party_size(text):
+    text_lower = text.lower()
+    for pattern in LEGACY_PARTY_SIZE_PATTERNS:
+        match = re.search(pattern, text_lower)
+        if match:
+            party_size = int(match.group(1))
+            if 1 <= party_size <= 50:
+                app_logger.debug(f"Party size extraído: {party_size}")
+                return party_size
+    return None
+
+
+def legacy_time(text):
+    text_lower = text.lower()
+    match = re.search(r'(\d{1,2}):(\d{2})', text_lower)
+    if match:
+        hour = int(match.group(1))
+        minute = int(match.group(2))
+        if 0 <= hour <= 23 and 0 <= minute <= 59:
+            return f"{hour:02d}:{minute:02d}"
+    match = re.search(r'(\d{1,2})\s*(?:pm|am)', text_lower)
+    if match:
+        hour = int(match.group(1))
+        is_pm = 'pm' in text_lower
+        if is_pm and hour != 12:
+            hour += 12
+        elif not is_pm and hour == 12:
+            hour = 0
+        if 0 <= hour <= 23:
+            return f"{hour:02d}:00"
+    match = re.search(r'(\d{1,2})\s*de\s*la\s*(tarde|noche|mañana)', text_lower)
+    if match:
+        hour = int(match.group(1))
+        period = match.group(2)
+        if period == 'tarde' and hour < 12:
+            hour += 12
+        elif period == 'noche' and hour < 12:
+            hour += 12
+        if 0 <= hour <= 23:
+            return f"{hour:02d}:00"
+    return None
+
+
+def legacy_date(text):
+    text_lower = text.lower()
+    for keyword, days_offset in LEGACY_DATE_KEYWORDS.items():
+        if keyword in text_lower:
+            target_date = datetime.now() + timedelta(days=days_offset)
+            app_logger.debug(f"Fecha extraída: {target_date.date()} (keyword: {keyword})")
+            return target_date
+    match = re.search(r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})', text_lower)
+    if match:
+        try:
+            target_date = datetime(int(match.group(3)), int(match.group(2)), int(match.group(1)))
+            app_logger.debug(f"Fecha extraída: {target_date.date()}")
+            return target_date
+        except ValueError:
+            pass
+    return None
+
+
+def legacy_extract_all(text):
+    return {
+        "party_size": legacy_party_size(text),
+        "time": legacy_time(text),
+        "date": legacy_date(text),
+    }
+
+
+def comparable(entities):
+    """Las fechas relativas dependen de datetime.now(): se comparan por día."""
+    date = entities["date"]
+    return (entities["party_size"], entities["time"], date.date() if date else None)
+
+
+def check_golden_corpus() -> int:
+    mismatches = 0
+    for text in GOLDEN_CORPUS:
+        expected = comparable(legacy_extract_all(text))
+        got = comparable(EntityExtractor.extract_all(text))
+        if expected != got:
+            mismatches += 1
+            print(f"DIFERENCIA {text!r}: esperado {expected}, obtenido {got}")
+    return mismatches
+
+
+def measure(fn, messages) -> float:
+    started = time.perf_counter()
+    for message in messages:
+        fn(message)
+    return len(messages) / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100000)
+    args = parser.parse_args()
+
+    if check_golden_corpus():
+        sys.exit(1)
+    print(f"Corpus dorado: {len(GOLDEN_CORPUS)} frases idénticas")
+
+    messages = [random.choice(GOLDEN_CORPUS) for _ in range(args.messages)]
+
+    before = measure(legacy_extract_all, messages)
+    after = measure(EntityExtractor.extract_all, messages)
+
+    print(f"{'modo':<26}{'extracciones/s':>16}")
+    print(f"{'re.search por patrón':<26}{before:>16,.0f}")
+    print(f"{'escaneo compilado':<26}{after:>16,.0f}")
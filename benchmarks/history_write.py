@@ -0,0 +1,61 @@
+"""
+Benchmark de escritura del historial de mensajes.
+Compara un commit por fila (MessageHistoryService.save_message) con el insert
+en bloque del buffer write-behind sobre una SQLite temporal con el perfil de
+producción, y muestra filas/segundo.
+
+Uso:
+    python benchmarks/history_write.py --rows 5000 --batch 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--rows", type=int, default=5000)
+parser.add_argument("--batch", type=int, default=500)
+args = parser.parse_args()
+
+tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp.name, 'history.db')}"
+
+from datetime import datetime
+
+from database.database import SessionLocal, engine, init_db
+from database.models import Platform
+from services.history_buffer import HistoryWriteBuffer
+from services.message_history_service import MessageHistoryService
+
+
+def row(i: int):
+    return {
+        "platform": Platform.WHATSAPP, "customer_id": "c", "message_text": f"mensaje {i}",
+        "is_from_customer": True, "message_id": f"m{i}", "timestamp": datetime.utcnow(),
+    }
+
+
+if __name__ == "__main__":
+    init_db()
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    for i in range(args.rows):
+        MessageHistoryService.save_message(db, Platform.WHATSAPP, "c", f"mensaje {i}", message_id=f"s{i}")
+    per_row = args.rows / (time.perf_counter() - started)
+    db.close()
+
+    started = time.perf_counter()
+    for offset in range(0, args.rows, args.batch):
+        HistoryWriteBuffer._insert([row(i) for i in range(offset, min(offset + args.batch, args.rows))])
+    bulk = args.rows / (time.perf_counter() - started)
+
+    engine.dispose()
+    tmp.cleanup()
+
+    print(f"{'modo':<26}{'filas/s':>12}")
+    print(f"{'commit por fila':<26}{per_row:>12,.0f}")
+    print(f"{f'insert en bloque ({args.batch})':<26}{bulk:>12,.0f}")
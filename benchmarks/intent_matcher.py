@@ -0,0 +1,102 @@
+"""
+Microbenchmark de detección de intenciones.
+Compara los escaneos `any(k in msg for k in [...])` anteriores con el
+IntentMatcher compilado y muestra mensajes/segundo. Antes de medir verifica
+REAL_PHRASINGS, frases reales de clientes con las intenciones esperadas
+(también las usa tests/test_intent_matcher.py).
+
+Uso:
+    python benchmarks/intent_matcher.py --messages 200000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.intent_matcher import intent_matcher
+
+SAMPLE_MESSAGES = [
+    "Hola, buenas noches",
+    "Quiero hacer una reserva para 4 personas mañana a las 21:00",
+    "¿Dónde están ubicados? ¿Cómo llego?",
+    "¿A qué hora abren el domingo?",
+    "Necesito hablar con alguien por favor",
+    "¿Tienen opciones veganas en el menú?",
+    "Gracias, nos vemos el sábado",
+    "Somos 6, ¿hay mesa para esta noche?",
+    "Aceptan tarjeta de crédito o solo efectivo?",
+    "ok 👍",
+]
+
+# Frases reales -> intenciones esperadas. Incluye inflexiones que el escaneo
+# por subcadenas detectaba y los falsos positivos que ya no debe dar.
+REAL_PHRASINGS = [
+    ("Quiero hacer una reserva para 4 personas", {"reservation"}),
+    ("quiero sacar turnos para el sábado", {"reservation"}),
+    ("tienen citas libres?", {"reservation"}),
+    ("dos reservaciones por favor", {"reservation"}),
+    ("Reservación para mañana", {"reservation"}),
+    ("reservamos para 4", {"reservation"}),
+    ("quiero reservarles una mesa", {"reservation"}),
+    ("¿Hay mesas libres hoy?", {"reservation"}),
+    ("me pueden ayudar?", {"agent"}),
+    ("Necesito hablar con alguien", {"agent"}),
+    ("somos 6 personas", set()),
+    ("ahora no, gracias", set()),
+    ("¿A qué hora abren?", {"schedule"}),
+    ("Hola, ¿dónde están ubicados?", {"greeting", "location"}),
+]
+
+
+def check_phrasings() -> list:
+    """Frases de REAL_PHRASINGS cuyas intenciones no coinciden con las esperadas."""
+    return [
+        (text, expected, set(intent_matcher.match(text)))
+        for text, expected in REAL_PHRASINGS
+        if set(intent_matcher.match(text)) != expected
+    ]
+
+
+def legacy_match(message_text: str):
+    """Escaneo anterior: una pasada por cada lista de palabras clave."""
+    msg = message_text.lower()
+    intents = set()
+    if any(k in msg for k in ["agente", "hablar con alguien", "ayuda", "persona"]):
+        intents.add("agent")
+    if any(k in msg for k in ["reserva", "mesa", "turno", "cita"]):
+        intents.add("reservation")
+    if any(k in msg for k in ["hola", "buenos dias", "buenas tardes", "buenas noches"]):
+        intents.add("greeting")
+    if any(k in msg for k in ["donde", "ubicacion", "ubicación", "llegar", "direccion", "dirección"]):
+        intents.add("location")
+    if any(k in msg for k in ["horario", "abren", "hora", "cuándo", "cuando"]):
+        intents.add("schedule")
+    return intents
+
+
+def measure(fn, messages) -> float:
+    started = time.perf_counter()
+    for message in messages:
+        fn(message)
+    return len(messages) / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200000)
+    args = parser.parse_args()
+
+    for text, expected, got in check_phrasings():
+        print(f"REGRESIÓN: {text!r}: se esperaba {sorted(expected)}, se obtuvo {sorted(got)}")
+
+    messages = [random.choice(SAMPLE_MESSAGES) for _ in range(args.messages)]
+
+    before = measure(legacy_match, messages)
+    after = measure(intent_matcher.match, messages)
+
+    print(f"{'modo':<22}{'mensajes/s':>14}")
+    print(f"{'any() por lista':<22}{before:>14,.0f}")
+    print(f"{'IntentMatcher':<22}{after:>14,.0f}")
@@ -0,0 +1,96 @@
+"""
+Benchmark de latencia de envío contra un servidor stub local.
+Compara un httpx.AsyncClient nuevo por envío (comportamiento anterior) con el
+pool compartido de MetaAPIClient y muestra p50/p99.
+
+Uso:
+    python benchmarks/meta_client_latency.py --requests 500 --concurrency 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from services.meta_api_client import MetaAPIClient
+
+stub = FastAPI()
+
+
+@stub.post("/{path:path}")
+async def stub_send(path: str):
+    return {"message_id": "stub"}
+
+
+@stub.head("/")
+async def stub_head():
+    return {}
+
+
+def start_stub(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(stub, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return {
+        "p50": statistics.median(ordered) * 1000,
+        "p99": ordered[int(len(ordered) * 0.99) - 1] * 1000
+    }
+
+
+async def run(send, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async def one(i):
+        async with semaphore:
+            started = time.perf_counter()
+            await send(f"user-{i}", "Hola")
+            samples.append(time.perf_counter() - started)
+
+    await asyncio.gather(*[one(i) for i in range(requests)])
+    return percentiles(samples)
+
+
+async def main(requests: int, concurrency: int, port: int):
+    base_url = f"http://127.0.0.1:{port}"
+
+    async def per_call_client(recipient_id, text):
+        async with httpx.AsyncClient() as client:
+            await client.post(f"{base_url}/me/messages", json={"recipient": {"id": recipient_id}, "message": {"text": text}})
+
+    pooled = MetaAPIClient()
+    pooled.base_url = base_url
+    await pooled.client.head(f"{base_url}/")
+
+    before = await run(per_call_client, requests, concurrency)
+    after = await run(pooled.send_messenger_message, requests, concurrency)
+    await pooled.close()
+
+    print(f"{'modo':<22}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+    print(f"{'cliente por envío':<22}{before['p50']:>10.2f}{before['p99']:>10.2f}")
+    print(f"{'pool compartido':<22}{after['p50']:>10.2f}{after['p99']:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    start_stub(args.port)
+    asyncio.run(main(args.requests, args.concurrency, args.port))
@@ -0,0 +1,114 @@
+"""
+Stress test de SQLite con lectores y escritores concurrentes.
+Simula el servidor de webhooks (escritores) y la app Tkinter / el dashboard
+Streamlit (lectores) en procesos separados sobre el mismo archivo, con la
+configuración anterior (journal DELETE, synchronous FULL) y con el perfil de
+database.sqlite_profile_pragmas. Muestra escrituras/s, lecturas/s y errores
+"database is locked".
+
+Uso:
+    python benchmarks/sqlite_stress.py --writers 4 --readers 4 --seconds 5
+"""
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.database import sqlite_profile_pragmas
+
+LEGACY_PRAGMAS = ["PRAGMA journal_mode=DELETE", "PRAGMA synchronous=FULL"]
+
+
+def connect(path: str, pragmas):
+    # timeout=5 es el valor por defecto de sqlite3, el que usaba el engine anterior
+    conn = sqlite3.connect(path, timeout=5)
+    for pragma in pragmas:
+        conn.execute(pragma)
+    return conn
+
+
+def writer(path, pragmas, deadline, results):
+    conn = connect(path, pragmas)
+    writes = locked = 0
+    while time.time() < deadline:
+        try:
+            # Como MessageProcessor: historial + reserva + notificación en transacciones cortas
+            conn.execute("INSERT INTO messages_history (customer_id, message_text) VALUES ('c', 'reserva para 2')")
+            conn.commit()
+            conn.execute("INSERT INTO reservations (customer_id, status) VALUES ('c', 'PENDING')")
+            conn.execute("INSERT INTO notifications (message, is_read) VALUES ('Nueva reserva', 0)")
+            conn.commit()
+            writes += 1
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            conn.rollback()
+            locked += 1
+    results.put(("write", writes, locked))
+
+
+def reader(path, pragmas, deadline, results):
+    conn = connect(path, pragmas)
+    reads = locked = 0
+    while time.time() < deadline:
+        try:
+            # Como el refresco de la UI: pendientes + contador de no leídas
+            conn.execute("SELECT * FROM reservations WHERE status = 'PENDING' ORDER BY id DESC LIMIT 50").fetchall()
+            conn.execute("SELECT COUNT(*) FROM notifications WHERE is_read = 0").fetchone()
+            reads += 1
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            locked += 1
+    results.put(("read", reads, locked))
+
+
+def run(pragmas, writers: int, readers: int, seconds: float):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stress.db")
+        conn = connect(path, pragmas)
+        conn.executescript("""
+            CREATE TABLE messages_history (id INTEGER PRIMARY KEY, customer_id TEXT, message_text TEXT);
+            CREATE TABLE reservations (id INTEGER PRIMARY KEY, customer_id TEXT, status TEXT);
+            CREATE INDEX ix_reservations_status ON reservations (status);
+            CREATE TABLE notifications (id INTEGER PRIMARY KEY, message TEXT, is_read INTEGER);
+            CREATE INDEX ix_notifications_is_read ON notifications (is_read);
+        """)
+        conn.close()
+
+        results = multiprocessing.Queue()
+        deadline = time.time() + seconds
+        processes = [
+            multiprocessing.Process(target=writer, args=(path, pragmas, deadline, results)) for _ in range(writers)
+        ] + [
+            multiprocessing.Process(target=reader, args=(path, pragmas, deadline, results)) for _ in range(readers)
+        ]
+        for process in processes:
+            process.start()
+        totals = {"write": [0, 0], "read": [0, 0]}
+        for _ in processes:
+            kind, count, locked = results.get()
+            totals[kind][0] += count
+            totals[kind][1] += locked
+        for process in processes:
+            process.join()
+        return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{'perfil':<10}{'escrituras/s':>14}{'lecturas/s':>14}{'locked (esc/lect)':>20}")
+    for name, pragmas in (("anterior", LEGACY_PRAGMAS), ("perfil", sqlite_profile_pragmas())):
+        totals = run(pragmas, args.writers, args.readers, args.seconds)
+        (writes, write_locked), (reads, read_locked) = totals["write"], totals["read"]
+        print(f"{name:<10}{writes / args.seconds:>14,.0f}{reads / args.seconds:>14,.0f}{f'{write_locked}/{read_locked}':>20}")
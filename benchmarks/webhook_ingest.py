@@ -0,0 +1,132 @@
+"""
+Benchmark del camino de entrada de los webhooks (en proceso, vía ASGI).
+Compara el camino anterior (await request.json(), sin verificar la firma)
+con la dependency webhook_payload (un solo read del cuerpo, HMAC SHA256 sobre
+esos bytes y orjson) y muestra requests/s (mejor de --rounds rondas
+alternadas) y el costo por cuerpo de cada paso.
+
+Uso:
+    python benchmarks/webhook_ingest.py --requests 5000 --messages 1
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+from fastapi import Depends, FastAPI, Request
+
+from config import settings
+from utils.webhook_validator import webhook_payload, _json_loads
+
+app = FastAPI()
+
+
+def count_messages(data: dict) -> int:
+    return sum(
+        1
+        for entry in data.get("entry", [])
+        for change in entry.get("changes", [])
+        for message in change.get("value", {}).get("messages", [])
+        if message.get("text", {}).get("body")
+    )
+
+
+@app.post("/legacy")
+async def legacy(request: Request):
+    data = await request.json()
+    return {"status": "ok", "messages": count_messages(data)}
+
+
+@app.post("/verified")
+async def verified(data: dict = Depends(webhook_payload)):
+    return {"status": "ok", "messages": count_messages(data)}
+
+
+def whatsapp_payload(messages: int) -> bytes:
+    return json.dumps({
+        "object": "whatsapp_business_account",
+        "entry": [{
+            "id": "102290129340398",
+            "changes": [{
+                "field": "messages",
+                "value": {
+                    "messaging_product": "whatsapp",
+                    "metadata": {"display_phone_number": "15550783881", "phone_number_id": "106540352242922"},
+                    "contacts": [{"profile": {"name": "Cliente Ñandú"}, "wa_id": "5491155550000"}],
+                    "messages": [
+                        {
+                            "from": "5491155550000",
+                            "id": f"wamid.HBgNNTQ5MTE1NTU1MDAwMBUCABIYFjNFQjA{i:08d}",
+                            "timestamp": "1735689600",
+                            "type": "text",
+                            "text": {"body": "Hola, quiero reservar una mesa para 4 personas mañana a las 21:00 😊"}
+                        }
+                        for i in range(messages)
+                    ]
+                }
+            }]
+        }]
+    }, ensure_ascii=False).encode("utf-8")
+
+
+async def run(path: str, body: bytes, headers: dict, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                response = await client.post(path, content=body, headers=headers)
+                assert response.status_code == 200, response.text
+
+        await asyncio.gather(*(one() for _ in range(min(200, requests))))  # warmup
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return requests / (time.perf_counter() - started)
+
+
+async def main(requests: int, concurrency: int, messages: int, rounds: int):
+    body = whatsapp_payload(messages)
+    signature = hmac.new(settings.meta_app_secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    headers = {"Content-Type": "application/json", "X-Hub-Signature-256": f"sha256={signature}"}
+    settings.webhook_verify_signature = True
+
+    print(f"Payload: {len(body)} bytes, {messages} mensaje(s); parser: {_json_loads.__module__}")
+
+    # Costo por cuerpo, aislado del overhead HTTP/ASGI
+    def per_body(fn, number=2000):
+        return timeit.timeit(fn, number=number) / number * 1e6
+
+    secret = settings.meta_app_secret.encode("utf-8")
+    steps = [
+        ("json.loads (request.json)", lambda: json.loads(body)),
+        ("HMAC SHA256", lambda: hmac.new(secret, body, hashlib.sha256).hexdigest()),
+        (f"{_json_loads.__module__}.loads (webhook_payload)", lambda: _json_loads(body)),
+    ]
+    for label, step in steps:
+        print(f"  {label + ':':<34} {per_body(step):8.1f} us")
+
+    legacy_rps = verified_rps = 0.0
+    for _ in range(rounds):
+        legacy_rps = max(legacy_rps, await run("/legacy", body, headers, requests, concurrency))
+        verified_rps = max(verified_rps, await run("/verified", body, headers, requests, concurrency))
+    print(f"Sin verificar (request.json):          {legacy_rps:10.0f} req/s")
+    print(f"Verificado (raw body + HMAC + orjson): {verified_rps:10.0f} req/s  ({verified_rps / legacy_rps:.2f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=1, help="mensajes por webhook")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.messages, args.rounds))
@@ -30,6 +30,26 @@ class Settings(BaseSettings):
     
     # Database Configuration
     database_url: str = Field(default="sqlite:///./reservations.db", alias="DATABASE_URL")
+    db_threads: int = Field(default=4, alias="DB_THREADS")  # Threads para I/O de BD desde el camino async
+    db_echo: bool = Field(default=False, alias="DB_ECHO")  # Log de cada query SQL
+    db_pool_size: int = Field(default=5, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(default=30.0, alias="DB_POOL_TIMEOUT")
+    
+    # Historial de mensajes: "sync" (durable, un insert por mensaje) o "buffered" (write-behind con insert en bloque).
+    # buffered saca el registro de deduplicación de la transacción del mensaje: tras una caída, un
+    # reenvío de Meta vuelve a crear la reserva y la respuesta (ver .env.example)
+    history_write_mode: str = Field(default="sync", alias="HISTORY_WRITE_MODE")
+    history_flush_max_rows: int = Field(default=500, alias="HISTORY_FLUSH_MAX_ROWS")
+    history_flush_interval: float = Field(default=1.0, alias="HISTORY_FLUSH_INTERVAL")
+    history_buffer_max_pending: int = Field(default=10000, alias="HISTORY_BUFFER_MAX_PENDING")
+    
+    # SQLite Performance Profile (pragmas aplicados a cada conexión)
+    sqlite_journal_mode: str = Field(default="WAL", alias="SQLITE_JOURNAL_MODE")
+    sqlite_synchronous: str = Field(default="NORMAL", alias="SQLITE_SYNCHRONOUS")
+    sqlite_busy_timeout_ms: int = Field(default=5000, alias="SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_cache_size: int = Field(default=-64000, alias="SQLITE_CACHE_SIZE")  # negativo = KiB (64 MB)
+    sqlite_mmap_size: int = Field(default=268435456, alias="SQLITE_MMAP_SIZE")  # bytes (256 MB)
     
     # Server Configuration
     host: str = Field(default="0.0.0.0", alias="HOST")
@@ -40,16 +60,78 @@ class Settings(BaseSettings):
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
     log_file: str = Field(default="app.log", alias="LOG_FILE")
     
+    # Verificación de X-Hub-Signature-256 en los webhooks (desactivar solo en desarrollo)
+    webhook_verify_signature: bool = Field(default=True, alias="WEBHOOK_VERIFY_SIGNATURE")
+    
+    # Clave de los endpoints internos (exportación, estado de reservas, feed), header X-Admin-Key.
+    # Vacía = esos endpoints responden 503
+    admin_api_key: str = Field(default="", alias="ADMIN_API_KEY")
+    
     # Webhook Base URL (ngrok/Cloudflare)
     webhook_base_url: str = Field(default="http://localhost:8000", alias="WEBHOOK_BASE_URL")
     
     # WhatsApp Agent Number (for notifications)
     agent_whatsapp_number: str = Field(..., alias="AGENT_WHATSAPP_NUMBER")
     
+    # Base de conocimientos (ruta relativa a la raíz del proyecto, recarga en caliente)
+    knowledge_base_path: str = Field(default="restaurant_info.json", alias="KNOWLEDGE_BASE_PATH")
+    knowledge_base_check_interval: float = Field(default=2.0, alias="KNOWLEDGE_BASE_CHECK_INTERVAL")
+    faq_min_score: float = Field(default=0.5, alias="FAQ_MIN_SCORE")
+    
+    # Ingest Queue (procesamiento de webhooks en segundo plano)
+    ingest_workers: int = Field(default=4, alias="INGEST_WORKERS")
+    ingest_queue_size: int = Field(default=1000, alias="INGEST_QUEUE_SIZE")
+    ingest_drain_timeout: float = Field(default=10.0, alias="INGEST_DRAIN_TIMEOUT")
+    ingest_customer_max_pending: int = Field(default=20, alias="INGEST_CUSTOMER_MAX_PENDING")
+    ingest_degraded_threshold: int = Field(default=500, alias="INGEST_DEGRADED_THRESHOLD")
+    
+    # Deduplicación de webhooks reenviados por Meta
+    dedupe_cache_size: int = Field(default=50000, alias="DEDUPE_CACHE_SIZE")
+    dedupe_ttl_seconds: float = Field(default=86400.0, alias="DEDUPE_TTL_SECONDS")
+    
     # Meta API URLs
     graph_api_version: str = "v21.0"
     graph_api_base_url: str = "https://graph.facebook.com"
     
+    # Meta API HTTP Client (pool compartido)
+    meta_http2: bool = Field(default=False, alias="META_HTTP2")
+    meta_max_connections: int = Field(default=50, alias="META_MAX_CONNECTIONS")
+    meta_max_keepalive_connections: int = Field(default=20, alias="META_MAX_KEEPALIVE_CONNECTIONS")
+    meta_keepalive_expiry: float = Field(default=60.0, alias="META_KEEPALIVE_EXPIRY")
+    meta_timeout: float = Field(default=10.0, alias="META_TIMEOUT")
+    meta_connect_timeout: float = Field(default=5.0, alias="META_CONNECT_TIMEOUT")
+    meta_warmup_connections: int = Field(default=2, alias="META_WARMUP_CONNECTIONS")
+    
+    # Outbound Dispatcher (rate limit y reintentos por plataforma/remitente)
+    outbound_rate_per_second: float = Field(default=20.0, alias="OUTBOUND_RATE_PER_SECOND")
+    outbound_burst: int = Field(default=40, alias="OUTBOUND_BURST")
+    outbound_lane_concurrency: int = Field(default=4, alias="OUTBOUND_LANE_CONCURRENCY")
+    outbound_queue_size: int = Field(default=5000, alias="OUTBOUND_QUEUE_SIZE")
+    outbound_max_retries: int = Field(default=5, alias="OUTBOUND_MAX_RETRIES")
+    outbound_backoff_base: float = Field(default=0.5, alias="OUTBOUND_BACKOFF_BASE")
+    outbound_backoff_max: float = Field(default=30.0, alias="OUTBOUND_BACKOFF_MAX")
+    outbound_drain_timeout: float = Field(default=10.0, alias="OUTBOUND_DRAIN_TIMEOUT")
+    
+    # Outbox (envíos salientes persistidos en la base de datos)
+    outbox_batch_size: int = Field(default=50, alias="OUTBOX_BATCH_SIZE")
+    outbox_lane_max_in_flight: int = Field(default=200, alias="OUTBOX_LANE_MAX_IN_FLIGHT")
+    outbox_poll_interval: float = Field(default=1.0, alias="OUTBOX_POLL_INTERVAL")  # también el intervalo de reintentos
+    outbox_max_attempts: int = Field(default=5, alias="OUTBOX_MAX_ATTEMPTS")
+    outbox_retry_delay: float = Field(default=60.0, alias="OUTBOX_RETRY_DELAY")
+    outbox_claim_lease: float = Field(default=300.0, alias="OUTBOX_CLAIM_LEASE")  # mayor que un envío con todos sus reintentos
+    
+    # Feed en vivo (SSE) de reservas y notificaciones
+    event_feed_poll_interval: float = Field(default=0.5, alias="EVENT_FEED_POLL_INTERVAL")  # eventos escritos por otros procesos
+    event_feed_buffer: int = Field(default=1000, alias="EVENT_FEED_BUFFER")  # eventos recientes en memoria para reanudar
+    event_feed_subscriber_queue: int = Field(default=256, alias="EVENT_FEED_SUBSCRIBER_QUEUE")
+    event_feed_max_subscribers: int = Field(default=20, alias="EVENT_FEED_MAX_SUBSCRIBERS")  # 0 = sin tope
+    event_feed_heartbeat: float = Field(default=15.0, alias="EVENT_FEED_HEARTBEAT")
+    event_feed_retention_hours: float = Field(default=24.0, alias="EVENT_FEED_RETENTION_HOURS")
+    event_feed_url: str = Field(default="http://localhost:8000/events/stream", alias="EVENT_FEED_URL")  # usado por Tkinter/Streamlit
+    
+    # Dashboard Streamlit: vigencia de los listados cacheados (respaldo si no hay feed)
+    dashboard_cache_ttl: float = Field(default=30.0, alias="DASHBOARD_CACHE_TTL")
+    
     @property
     def graph_api_url(self) -> str:
         """URL base de Graph API con versión"""
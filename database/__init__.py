@@ -1,8 +1,8 @@
 """
 Módulo de base de datos.
 """
-from .database import engine, SessionLocal, get_db, Base, init_db
-from .models import PendingReservation, MessagesHistory, Notification
+from .database import engine, SessionLocal, get_db, Base, init_db, run_db, shutdown_db_executor
+from .models import PendingReservation, MessagesHistory, MessageEntities, Notification, NotificationCounter, FeedEvent, OutboxMessage
 
 __all__ = [
     "engine",
@@ -10,7 +10,13 @@ __all__ = [
     "get_db",
     "Base",
     "init_db",
+    "run_db",
+    "shutdown_db_executor",
     "PendingReservation",
     "MessagesHistory",
-    "Notification"
+    "MessageEntities",
+    "Notification",
+    "NotificationCounter",
+    "FeedEvent",
+    "OutboxMessage"
 ]
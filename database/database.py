@@ -2,7 +2,12 @@
 Configuración de SQLAlchemy para la base de datos.
 Implementa connection pooling y dependency injection para FastAPI.
 """
-from sqlalchemy import create_engine
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, TypeVar
+from sqlalchemy import create_engine, event, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from config import settings
@@ -10,12 +15,53 @@ from utils.logger import app_logger
 
 # Crear engine de SQLAlchemy
 # Para SQLite: check_same_thread=False permite usar en múltiples threads
+_is_sqlite = settings.database_url.startswith("sqlite")
+_is_sqlite_memory = _is_sqlite and (":memory:" in settings.database_url or settings.database_url.rstrip("/") == "sqlite:")
+
+# Las BD en memoria usan un pool de una conexión que no admite dimensionado
+_pool_options = {} if _is_sqlite_memory else {
+    "pool_size": settings.db_pool_size,
+    "max_overflow": settings.db_max_overflow,
+    "pool_timeout": settings.db_pool_timeout,
+}
+
 engine = create_engine(
     settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
-    echo=settings.debug  # Log de queries SQL en modo debug
+    connect_args={"check_same_thread": False} if _is_sqlite else {},
+    echo=settings.db_echo,  # Log de cada query SQL (solo para depurar)
+    **_pool_options
 )
 
+
+def sqlite_profile_pragmas(in_memory: bool = False) -> List[str]:
+    """
+    Perfil de rendimiento de SQLite según la configuración.
+    
+    WAL permite que el servidor de webhooks, la app Tkinter y el dashboard
+    Streamlit lean mientras otro proceso escribe; busy_timeout hace que un
+    escritor espere el lock en lugar de fallar con "database is locked".
+    """
+    pragmas = [] if in_memory else [f"PRAGMA journal_mode={settings.sqlite_journal_mode}"]
+    return pragmas + [
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+        f"PRAGMA cache_size={int(settings.sqlite_cache_size)}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}",
+    ]
+
+
+@event.listens_for(engine, "connect")
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Aplica el perfil de SQLite a cada conexión nueva del pool."""
+    if not _is_sqlite:
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in sqlite_profile_pragmas(_is_sqlite_memory):
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
 # Crear SessionLocal para dependency injection
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -26,6 +72,31 @@ SessionLocal = sessionmaker(
 # Base para los modelos ORM
 Base = declarative_base()
 
+# Pool de threads dedicado a la base de datos: el camino async (workers de
+# ingesta) delega aquí cada llamada bloqueante para no frenar el event loop.
+db_executor = ThreadPoolExecutor(max_workers=settings.db_threads, thread_name_prefix="db")
+
+T = TypeVar("T")
+
+
+async def run_db(fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Ejecuta una llamada síncrona de base de datos en el pool dedicado.
+    
+    Uso desde código async:
+        reservation = await run_db(ReservationService.create_reservation, db, ...)
+    
+    Returns:
+        El resultado de fn(*args, **kwargs)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, functools.partial(fn, *args, **kwargs))
+
+
+def shutdown_db_executor():
+    """Espera a que terminen las operaciones en curso y libera los threads."""
+    db_executor.shutdown(wait=True)
+
 
 def get_db() -> Session:
     """
@@ -53,4 +124,41 @@ def init_db():
     """
     app_logger.info("Inicializando base de datos...")
     Base.metadata.create_all(bind=engine)
-    app_logger.info("Base de datos inicializada correctamente")
\ No newline at end of file
+    
+    # create_all no agrega índices nuevos a tablas que ya existen
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except Exception as e:
+                app_logger.warning(f"No se pudo crear el índice {index.name}: {e}")
+    
+    sync_notification_counter()
+    app_logger.info("Base de datos inicializada correctamente")
+
+
+def sync_notification_counter():
+    """
+    Recalcula el contador de notificaciones no leídas desde la tabla.
+    Se ejecuta en cada arranque: crea la fila en bases existentes y corrige
+    cualquier desvío (p. ej. filas modificadas a mano).
+    """
+    from .models import Notification, NotificationCounter
+    
+    unread = (
+        select(func.count()).select_from(Notification)
+        .where(Notification.is_read.is_(False))
+        .scalar_subquery()
+    )
+    with engine.begin() as conn:
+        updated = conn.execute(
+            update(NotificationCounter)
+            .where(NotificationCounter.id == 1)
+            .values(unread_count=unread, version=NotificationCounter.version + 1)
+        ).rowcount
+        if not updated:
+            try:
+                with conn.begin_nested():
+                    conn.execute(insert(NotificationCounter).values(id=1, unread_count=unread, version=1))
+            except IntegrityError:
+                pass  # otro proceso la creó al mismo tiempo
@@ -3,7 +3,7 @@ Modelos de base de datos usando SQLAlchemy ORM.
 Define las tablas para reservas, mensajes y notificaciones.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Enum as SQLEnum, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, Enum as SQLEnum, Text
 from sqlalchemy.orm import relationship
 import enum
 from .database import Base
@@ -23,6 +23,16 @@ class ReservationStatus(str, enum.Enum):
     REJECTED = "rejected"
 
 
+class OutboxStatus(str, enum.Enum):
+    """Estados de un mensaje saliente en el outbox"""
+    HELD = "held"  # respuesta retenida en modo degradado
+    COALESCED = "coalesced"  # retenida y reemplazada por otra más reciente
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
 class PendingReservation(Base):
     """
     Tabla de reservas (pendientes y confirmadas).
@@ -55,6 +65,13 @@ class PendingReservation(Base):
     # Relaciones
     notifications = relationship("Notification", back_populates="reservation", cascade="all, delete-orphan")
     
+    # Índices de los listados paginados (filtro por estado + orden por fecha)
+    __table_args__ = (
+        Index("ix_reservations_status_created_at", "status", "created_at"),
+        Index("ix_reservations_status_updated_at", "status", "updated_at"),
+        Index("ix_reservations_created_at", "created_at"),
+    )
+    
     def __repr__(self):
         return f"<Reservation(id={self.id}, platform={self.platform}, status={self.status}, customer={self.customer_name})>"
 
@@ -77,7 +94,7 @@ class MessagesHistory(Base):
     is_from_customer = Column(Boolean, default=True, nullable=False)  # True si es del cliente, False si es del bot
     
     # Metadata
-    message_id = Column(String(255), nullable=True)  # ID del mensaje de la plataforma
+    message_id = Column(String(255), nullable=True, unique=True, index=True)  # ID del mensaje de la plataforma (mid / wamid)
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     
     def __repr__(self):
@@ -85,6 +102,27 @@ class MessagesHistory(Base):
         return f"<Message(id={self.id}, {direction} customer, platform={self.platform})>"
 
 
+class MessageEntities(Base):
+    """
+    Entidades extraídas de un mensaje del historial.
+    Se regeneran con services/entity_backfill.py cuando cambian las reglas.
+    """
+    __tablename__ = "message_entities"
+    
+    message_history_id = Column(Integer, ForeignKey("messages_history.id", ondelete="CASCADE"), primary_key=True)
+    
+    # Entidades (mismos formatos que en reservations)
+    reservation_date = Column(DateTime, nullable=True)
+    reservation_time = Column(String(10), nullable=True)
+    party_size = Column(Integer, nullable=True)
+    
+    # Timestamp de la extracción
+    extracted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<MessageEntities(message_history_id={self.message_history_id}, date={self.reservation_date}, time={self.reservation_time}, party_size={self.party_size})>"
+
+
 class Notification(Base):
     """
     Notificaciones para el agente.
@@ -111,4 +149,74 @@ class Notification(Base):
     
     def __repr__(self):
         status = "READ" if self.is_read else "UNREAD"
-        return f"<Notification(id={self.id}, {status}, reservation_id={self.reservation_id})>"
\ No newline at end of file
+        return f"<Notification(id={self.id}, {status}, reservation_id={self.reservation_id})>"
+
+
+class NotificationCounter(Base):
+    """
+    Contador de notificaciones no leídas (fila única, id=1).
+    Se actualiza en la misma transacción que crea o marca notificaciones, así
+    leer el contador es O(1) en lugar de un COUNT(*) sobre notifications.
+    version aumenta con cada cambio: los clientes que consultan
+    periódicamente solo vuelven a pedir la lista si cambió.
+    """
+    __tablename__ = "notification_counters"
+    
+    id = Column(Integer, primary_key=True)
+    unread_count = Column(Integer, default=0, nullable=False)
+    version = Column(Integer, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f"<NotificationCounter(unread={self.unread_count}, version={self.version})>"
+
+
+
+class FeedEvent(Base):
+    """
+    Eventos del feed en vivo (reserva creada, cambio de estado, notificaciones).
+    Se escriben en la misma transacción que el cambio que describen, desde
+    cualquier proceso (servidor, Tkinter, Streamlit); el servidor los lee por
+    id y los difunde por SSE. El id es el Last-Event-ID para reanudar, por eso
+    usa AUTOINCREMENT: SQLite no reutiliza ids aunque la poda vacíe la tabla.
+    """
+    __tablename__ = "feed_events"
+    __table_args__ = {"sqlite_autoincrement": True}
+    
+    id = Column(Integer, primary_key=True)
+    event_type = Column(String(50), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<FeedEvent(id={self.id}, type={self.event_type})>"
+
+
+class OutboxMessage(Base):
+    """
+    Mensajes salientes (respuestas automáticas y avisos al agente).
+    Se escriben en la misma transacción que el mensaje entrante que los
+    origina; OutboxWorker los envía y registra el resultado, así una caída
+    entre el commit y el envío no pierde la respuesta. En modo degradado las
+    respuestas se guardan como HELD y se liberan con un UPDATE.
+    """
+    __tablename__ = "outbox"
+    
+    id = Column(Integer, primary_key=True)
+    platform = Column(SQLEnum(Platform), nullable=False)
+    recipient_id = Column(String(255), nullable=False)
+    message_text = Column(Text, nullable=False)
+    kind = Column(String(30), nullable=True)  # tipo de respuesta o "agent_alert"
+    status = Column(SQLEnum(OutboxStatus), default=OutboxStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index("ix_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+        # Envío activo más antiguo de cada destinatario (orden por cliente)
+        Index("ix_outbox_status_recipient", "status", "platform", "recipient_id", "id"),
+    )
+    
+    def __repr__(self):
+        return f"<OutboxMessage(id={self.id}, {self.status.value}, to={self.recipient_id})>"
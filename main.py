@@ -5,8 +5,16 @@ Punto de entrada del servidor de webhooks.
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from database import init_db
-from routers import instagram_webhook, messenger_webhook, whatsapp_webhook
+from database import init_db, shutdown_db_executor
+from routers import instagram_webhook, messenger_webhook, whatsapp_webhook, reservations_export, reservations, events
+from services.ingest_queue import ingest_queue
+from services.meta_api_client import meta_api_client
+from services.outbound_dispatcher import outbound_dispatcher
+from services.outbox_worker import outbox_worker
+from services.dedupe_cache import dedupe_cache
+from services.history_buffer import history_buffer
+from services.event_feed import event_feed
+from services.knowledge_base import knowledge_base
 from utils.logger import app_logger
 from config import settings
 
@@ -24,10 +32,39 @@ async def lifespan(app: FastAPI):
     # Inicializar base de datos
     init_db()
     
+    # Pool de conexiones compartido hacia Graph API
+    await meta_api_client.start()
+    await outbound_dispatcher.start()
+    
+    # Envíos pendientes del outbox (incluidos los de antes de un reinicio)
+    await outbox_worker.start()
+    
+    # Buffer write-behind del historial
+    await history_buffer.start()
+    
+    # Feed en vivo para los clientes (SSE)
+    await event_feed.start()
+    
+    # Recarga en caliente de la base de conocimientos
+    await knowledge_base.start()
+    
+    # Iniciar workers de la cola de ingesta
+    await ingest_queue.start()
+    
     yield
     
     # Shutdown
     app_logger.info("Cerrando aplicación...")
+    
+    # Drenar mensajes pendientes antes de salir
+    await ingest_queue.stop(timeout=settings.ingest_drain_timeout)
+    await outbox_worker.stop(timeout=settings.outbound_drain_timeout)
+    await history_buffer.stop()
+    await event_feed.stop()
+    await knowledge_base.stop()
+    await outbound_dispatcher.stop(timeout=settings.outbound_drain_timeout)
+    await meta_api_client.close()
+    shutdown_db_executor()
 
 
 # Crear aplicación FastAPI
@@ -51,6 +88,9 @@ app.add_middleware(
 app.include_router(instagram_webhook.router)
 app.include_router(messenger_webhook.router)
 app.include_router(whatsapp_webhook.router)
+app.include_router(reservations.router)
+app.include_router(reservations_export.router)
+app.include_router(events.router)
 
 
 @app.get("/")
@@ -76,6 +116,21 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """
+    Métricas internas para dimensionar la cola de ingesta y los envíos.
+    """
+    return {
+        "ingest": ingest_queue.stats(),
+        "outbound": outbound_dispatcher.stats(),
+        "outbox": outbox_worker.stats(),
+        "dedupe": {"size": len(dedupe_cache), "hits": dedupe_cache.hits},
+        "history": history_buffer.stats(),
+        "events": event_feed.stats()
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     
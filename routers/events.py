@@ -0,0 +1,65 @@
+"""
+Router del feed en vivo (Server-Sent Events).
+"""
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from services.event_feed import event_feed
+from utils.admin_auth import require_admin_key
+from config import settings
+
+router = APIRouter(prefix="/events", tags=["Events"], dependencies=[Depends(require_admin_key)])
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    last_event_id: Optional[int] = None,
+    last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Eventos de reservas y notificaciones en text/event-stream.
+    Para reanudar, enviar el último id recibido en Last-Event-ID (lo hace
+    EventSource al reconectarse) o en ?last_event_id=.
+    Con EVENT_FEED_MAX_SUBSCRIBERS conexiones abiertas responde 503.
+    """
+    if event_feed.full:
+        event_feed.rejected_subscribers += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Demasiadas conexiones al feed"
+        )
+    resume_from = last_event_id_header if last_event_id_header is not None else last_event_id
+    queue, missed = await event_feed.subscribe(resume_from)
+
+    async def body():
+        sent_id = resume_from or 0
+        try:
+            # Reintento sugerido al cliente si se corta la conexión
+            yield b"retry: 3000\n\n"
+            for message in missed:
+                yield message.encode()
+                # Tras un feed.reset por ids reiniciados, sent_id baja al último id actual
+                sent_id = message.id
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), settings.event_feed_heartbeat)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield b": keepalive\n\n"
+                    continue
+                if message is None:
+                    return
+                if message.id <= sent_id:
+                    continue  # ya enviado en el tramo de reanudación
+                yield message.encode()
+                sent_id = message.id
+        finally:
+            event_feed.unsubscribe(queue)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,39 @@
+"""
+Router de gestión de reservas.
+"""
+from typing import List, Literal
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel, Field
+from database import SessionLocal, run_db
+from database.models import ReservationStatus
+from services.reservation_service import ReservationService, BULK_UPDATED
+from utils.admin_auth import require_admin_key
+
+router = APIRouter(prefix="/reservations", tags=["Reservations"], dependencies=[Depends(require_admin_key)])
+
+
+class BulkStatusRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+    status: Literal["confirmed", "rejected"]
+
+
+def _bulk_update(ids: List[int], new_status: ReservationStatus):
+    db = SessionLocal()
+    try:
+        return ReservationService.bulk_update_status(db, ids, new_status)
+    finally:
+        db.close()
+
+
+@router.post("/status")
+async def bulk_update_status(request: BulkStatusRequest):
+    """
+    Acepta o rechaza varias reservas pendientes en una sola transacción.
+    Devuelve el resultado de cada id: updated, not_found o invalid_status
+    (ya no estaba pendiente).
+    """
+    results = await run_db(_bulk_update, request.ids, ReservationStatus(request.status))
+    return {
+        "updated": sum(1 for outcome in results.values() if outcome == BULK_UPDATED),
+        "results": [{"id": reservation_id, "result": outcome} for reservation_id, outcome in results.items()]
+    }
@@ -0,0 +1,50 @@
+"""
+Router de exportación de reservas (reportes).
+"""
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from database import SessionLocal, run_db
+from database.models import Platform
+from services.reservation_export import fetch_chunk, csv_header, encode_csv, encode_ndjson, MEDIA_TYPES
+from utils.admin_auth import require_admin_key
+
+router = APIRouter(prefix="/export", tags=["Export"], dependencies=[Depends(require_admin_key)])
+
+@router.get("/reservations")
+async def export_reservations(
+    format: Literal["csv", "ndjson"] = "csv",
+    start: Optional[datetime] = Query(None, description="created_at desde (inclusivo)"),
+    end: Optional[datetime] = Query(None, description="created_at hasta (exclusivo)"),
+    platform: Optional[Platform] = None,
+    chunk_size: int = Query(1000, ge=1, le=10000)
+):
+    """
+    Descarga las reservas en streaming: cada bloque se lee en el pool de la BD,
+    se codifica y se envía, así la memoria no crece con el tamaño de la tabla.
+    Para Parquet usar el CLI (python -m services.reservation_export).
+    """
+    encode = encode_csv if format == "csv" else encode_ndjson
+
+    async def body():
+        db = SessionLocal()
+        try:
+            if format == "csv":
+                yield csv_header()
+            after_id = 0
+            while True:
+                rows = await run_db(fetch_chunk, db, chunk_size, after_id, start, end, platform)
+                if not rows:
+                    return
+                yield encode(rows)
+                after_id = rows[-1][0]
+        finally:
+            await run_db(db.close)
+
+    filename = f"reservations.{format}"
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
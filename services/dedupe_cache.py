@@ -0,0 +1,54 @@
+"""
+Caché de deduplicación de mensajes entrantes.
+Meta reenvía los webhooks ante timeouts; este conjunto LRU/TTL acotado
+permite descartar un reintento con una sola búsqueda en memoria.
+El índice único sobre messages_history.message_id es el respaldo persistente.
+"""
+import time
+from collections import OrderedDict
+from typing import Optional
+from config import settings
+
+
+class DedupeCache:
+    """
+    Conjunto LRU con expiración por TTL.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self.hits = 0
+
+    def check_and_add(self, key: str) -> bool:
+        """
+        Registra la clave y devuelve True si ya estaba vigente (duplicado).
+        """
+        now = time.monotonic()
+        expires_at = self._entries.get(key)
+        if expires_at is not None and expires_at > now:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True
+
+        self._entries[key] = now + self.ttl
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return False
+
+    def discard(self, key: str):
+        """Olvida una clave (p. ej. si su procesamiento falló)."""
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def dedupe_key(platform: str, message_id: Optional[str]) -> Optional[str]:
+    """Clave de deduplicación a partir del ID de mensaje de la plataforma."""
+    return f"{platform}:{message_id}" if message_id else None
+
+
+dedupe_cache = DedupeCache(maxsize=settings.dedupe_cache_size, ttl=settings.dedupe_ttl_seconds)
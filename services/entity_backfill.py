@@ -0,0 +1,119 @@
+"""
+Reprocesado de entidades sobre el historial de mensajes.
+Recorre messages_history por bloques (paginación por id), extrae fecha, hora y
+cantidad de personas con EntityExtractor.extract_batch y reescribe la tabla
+message_entities en bloque. Se ejecuta cada vez que cambian las reglas.
+
+Uso:
+    python -m services.entity_backfill --chunk-size 5000 --workers 4
+"""
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Iterator, List, Tuple
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from database.database import SessionLocal, init_db
+from database.models import MessagesHistory, MessageEntities
+from utils.entity_extractor import EntityExtractor
+from utils.logger import app_logger
+
+Chunk = Tuple[List[int], List[str], List[datetime]]
+
+
+def iter_message_chunks(db: Session, chunk_size: int, after_id: int = 0) -> Iterator[Chunk]:
+    """
+    Lee los mensajes de clientes en bloques de chunk_size, ordenados por id.
+    Usa paginación por clave (id > último) para no cargar la tabla entera.
+    """
+    while True:
+        rows = db.execute(
+            select(MessagesHistory.id, MessagesHistory.message_text, MessagesHistory.timestamp)
+            .where(MessagesHistory.is_from_customer.is_(True), MessagesHistory.id > after_id)
+            .order_by(MessagesHistory.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            return
+        ids, texts, timestamps = (list(column) for column in zip(*rows))
+        yield ids, texts, timestamps
+        after_id = ids[-1]
+
+
+def write_entities(db: Session, ids: List[int], columns: dict) -> int:
+    """
+    Reemplaza las entidades de un bloque de mensajes en una sola transacción.
+    Solo se guardan filas con al menos una entidad; las anteriores se borran
+    siempre para que un cambio de reglas no deje resultados viejos.
+    """
+    now = datetime.utcnow()
+    rows = [
+        {
+            "message_history_id": message_id,
+            "reservation_date": date,
+            "reservation_time": time,
+            "party_size": party_size,
+            "extracted_at": now,
+        }
+        for message_id, party_size, time, date in zip(ids, columns["party_size"], columns["time"], columns["date"])
+        if party_size is not None or time is not None or date is not None
+    ]
+    db.execute(delete(MessageEntities).where(MessageEntities.message_history_id.in_(ids)))
+    if rows:
+        db.execute(insert(MessageEntities), rows)
+    db.commit()
+    return len(rows)
+
+
+def backfill_entities(db: Session, chunk_size: int = 5000, workers: int = 1, after_id: int = 0) -> int:
+    """
+    Reprocesa todo el historial y devuelve la cantidad de mensajes procesados.
+
+    Con workers > 1 la extracción de cada bloque corre en un pool de procesos
+    mientras se lee y escribe el siguiente; se mantienen como mucho `workers`
+    bloques en vuelo para no acumular la tabla en memoria.
+    """
+    processed = 0
+    with_entities = 0
+
+    def flush(ids: List[int], columns: dict):
+        nonlocal processed, with_entities
+        with_entities += write_entities(db, ids, columns)
+        processed += len(ids)
+        app_logger.info(f"Backfill de entidades: {processed} mensajes (hasta id {ids[-1]})")
+
+    if workers <= 1:
+        for ids, texts, timestamps in iter_message_chunks(db, chunk_size, after_id):
+            flush(ids, EntityExtractor.extract_batch(texts, timestamps))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = deque()
+            for ids, texts, timestamps in iter_message_chunks(db, chunk_size, after_id):
+                in_flight.append((ids, pool.submit(EntityExtractor.extract_batch, texts, timestamps)))
+                if len(in_flight) >= workers:
+                    ids, future = in_flight.popleft()
+                    flush(ids, future.result())
+            while in_flight:
+                ids, future = in_flight.popleft()
+                flush(ids, future.result())
+
+    app_logger.info(f"Backfill de entidades terminado: {processed} mensajes, {with_entities} con entidades")
+    return processed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=1, help="procesos de extracción (1 = en el proceso actual)")
+    parser.add_argument("--after-id", type=int, default=0, help="reanudar desde este id de messages_history")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        backfill_entities(db, chunk_size=args.chunk_size, workers=args.workers, after_id=args.after_id)
+    finally:
+        db.close()
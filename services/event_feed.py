@@ -0,0 +1,235 @@
+"""
+Feed en vivo de reservas y notificaciones (Server-Sent Events).
+Una única tarea del servidor lee feed_events por id y difunde cada evento a
+las colas de los suscriptores, en lugar de que cada cliente consulte la base
+de datos por su cuenta. Los eventos confirmados por el propio servidor
+despiertan la tarea al instante (evento after_commit de la sesión); los que
+escriben la app Tkinter o Streamlit llegan en la siguiente lectura, cada
+EVENT_FEED_POLL_INTERVAL segundos.
+
+Un cliente que se reconecta con Last-Event-ID recibe lo que se perdió desde
+el buffer en memoria o, si es más viejo, desde la tabla. Si el hueco supera
+EVENT_FEED_BUFFER eventos, o su id es posterior al último de la tabla (los
+ids volvieron a empezar), recibe "feed.reset" y debe recargar todo.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy import event
+from database.database import SessionLocal, run_db
+from services.feed_service import FeedService, PENDING_FLAG
+from utils.logger import app_logger
+from config import settings
+
+FEED_RESET = "feed.reset"
+
+
+@dataclass(frozen=True)
+class FeedMessage:
+    id: int
+    event_type: str
+    data: Dict[str, Any]
+
+    def encode(self) -> bytes:
+        """Formato text/event-stream."""
+        return f"id: {self.id}\nevent: {self.event_type}\ndata: {json.dumps(self.data)}\n\n".encode("utf-8")
+
+
+class EventFeed:
+    """
+    Difusor de eventos a suscriptores SSE.
+    Cada suscriptor tiene una cola acotada: si se llena (cliente lento) se lo
+    desconecta y al reconectarse reanuda desde su último id.
+    """
+
+    def __init__(
+        self,
+        poll_interval: float,
+        buffer_size: int,
+        subscriber_queue: int,
+        retention_hours: float,
+        max_subscribers: int = 0
+    ):
+        self.poll_interval = poll_interval
+        self.max_subscribers = max_subscribers  # 0 = sin tope
+        self.subscriber_queue = subscriber_queue
+        self.retention_hours = retention_hours
+        self._recent: deque = deque(maxlen=buffer_size)
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._last_id = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.dropped_subscribers = 0
+        self.rejected_subscribers = 0
+
+    @property
+    def buffer_size(self) -> int:
+        return self._recent.maxlen
+
+    @property
+    def full(self) -> bool:
+        return 0 < self.max_subscribers <= len(self._subscribers)
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._last_id = await run_db(self._read_last_id)
+        event.listen(SessionLocal, "after_commit", self._after_commit)
+        self._task = asyncio.create_task(self._tail(), name="event-feed")
+        app_logger.info(f"Feed de eventos iniciado desde id={self._last_id}")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        event.remove(SessionLocal, "after_commit", self._after_commit)
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        # Cerrar las conexiones SSE abiertas
+        for queue in list(self._subscribers):
+            self._close(queue)
+        self._subscribers.clear()
+
+    def _after_commit(self, session):
+        """Se ejecuta en el thread que hizo commit; despierta la lectura."""
+        if session.info.pop(PENDING_FLAG, False) and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    @staticmethod
+    def _read_last_id() -> int:
+        db = SessionLocal()
+        try:
+            return FeedService.get_last_id(db)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _read_after(last_id: int, limit: int) -> List[FeedMessage]:
+        db = SessionLocal()
+        try:
+            return [
+                FeedMessage(row.id, row.event_type, json.loads(row.payload))
+                for row in FeedService.get_events_after(db, last_id, limit)
+            ]
+        finally:
+            db.close()
+
+    def _prune(self) -> int:
+        db = SessionLocal()
+        try:
+            return FeedService.prune(db, self.retention_hours)
+        finally:
+            db.close()
+
+    async def _tail(self):
+        last_prune = time.monotonic()
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                while True:
+                    messages = await run_db(self._read_after, self._last_id, self.buffer_size)
+                    if not messages and await run_db(self._read_last_id) < self._last_id:
+                        self._reset_ids()
+                        continue
+                    for message in messages:
+                        self._publish(message)
+                    if len(messages) < self.buffer_size:
+                        break
+                if time.monotonic() - last_prune > 3600:
+                    last_prune = time.monotonic()
+                    pruned = await run_db(self._prune)
+                    if pruned:
+                        app_logger.info(f"Feed de eventos: {pruned} eventos viejos eliminados")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                app_logger.error(f"Error leyendo el feed de eventos: {e}")
+
+    def _reset_ids(self):
+        """
+        Los ids de la tabla volvieron a empezar (tabla vaciada sin AUTOINCREMENT):
+        se relee desde el principio y se desconecta a los suscriptores, que al
+        reconectarse con su id anterior reciben feed.reset.
+        """
+        app_logger.warning(f"Feed de eventos: los ids volvieron a empezar (último publicado {self._last_id})")
+        self._last_id = 0
+        self._recent.clear()
+        for queue in list(self._subscribers):
+            self._close(queue)
+        self._subscribers.clear()
+
+    def _publish(self, message: FeedMessage):
+        self._last_id = message.id
+        self._recent.append(message)
+        self.published += 1
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._subscribers.discard(queue)
+                self.dropped_subscribers += 1
+                self._close(queue)
+
+    @staticmethod
+    def _close(queue: asyncio.Queue):
+        """Señal de fin (None) aunque la cola esté llena."""
+        while True:
+            try:
+                queue.put_nowait(None)
+                return
+            except asyncio.QueueFull:
+                queue.get_nowait()
+
+    async def subscribe(self, last_event_id: Optional[int] = None) -> Tuple[asyncio.Queue, List[FeedMessage]]:
+        """
+        Registra un suscriptor.
+
+        Returns:
+            (cola de eventos nuevos, eventos perdidos desde last_event_id)
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.subscriber_queue)
+        self._subscribers.add(queue)
+        if last_event_id is not None and last_event_id > self._last_id:
+            # Id que la tabla ya no tiene: los ids volvieron a empezar
+            return queue, [FeedMessage(self._last_id, FEED_RESET, {"reason": "id_reset"})]
+        if last_event_id is None or last_event_id == self._last_id:
+            return queue, []
+
+        if self._recent and self._recent[0].id <= last_event_id + 1:
+            return queue, [message for message in self._recent if message.id > last_event_id]
+
+        missed = await run_db(self._read_after, last_event_id, self.buffer_size + 1)
+        if len(missed) > self.buffer_size:
+            return queue, [FeedMessage(self._last_id, FEED_RESET, {"reason": "gap"})]
+        return queue, missed
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "last_id": self._last_id,
+            "published": self.published,
+            "dropped_subscribers": self.dropped_subscribers,
+            "rejected_subscribers": self.rejected_subscribers,
+        }
+
+
+# Instancia global
+event_feed = EventFeed(
+    poll_interval=settings.event_feed_poll_interval,
+    buffer_size=settings.event_feed_buffer,
+    subscriber_queue=settings.event_feed_subscriber_queue,
+    retention_hours=settings.event_feed_retention_hours,
+    max_subscribers=settings.event_feed_max_subscribers
+)
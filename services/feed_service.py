@@ -0,0 +1,67 @@
+"""
+Registro de eventos del feed en vivo.
+Los servicios llaman a FeedService.record dentro de su transacción; el evento
+solo existe si el cambio se confirma.
+"""
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from database.models import FeedEvent
+
+# Tipos de evento
+RESERVATION_CREATED = "reservation.created"
+RESERVATION_STATUS_CHANGED = "reservation.status_changed"
+RESERVATIONS_STATUS_CHANGED = "reservations.status_changed"  # cambio en bloque: {"ids": [...], ...}
+NOTIFICATION_CREATED = "notification.created"
+NOTIFICATIONS_READ = "notifications.read"
+
+# Marca en session.info: la transacción escribió eventos (ver EventFeed)
+PENDING_FLAG = "feed_events_pending"
+
+
+class FeedService:
+    @staticmethod
+    def record(db: Session, event_type: str, data: Dict[str, Any]) -> None:
+        """Agrega un evento a la transacción en curso (sin commit)."""
+        db.add(FeedEvent(event_type=event_type, payload=json.dumps(data, default=str)))
+        db.info[PENDING_FLAG] = True
+
+    @staticmethod
+    def reservation_data(reservation) -> Dict[str, Any]:
+        """Resumen de una reserva para los eventos."""
+        return {
+            "id": reservation.id,
+            "platform": reservation.platform.value,
+            "customer_name": reservation.customer_name,
+            "status": reservation.status.value,
+            "reservation_date": reservation.reservation_date,
+            "reservation_time": reservation.reservation_time,
+            "party_size": reservation.party_size,
+        }
+
+    @staticmethod
+    def get_events_after(db: Session, last_id: int, limit: int) -> List[FeedEvent]:
+        return list(db.scalars(
+            select(FeedEvent).where(FeedEvent.id > last_id).order_by(FeedEvent.id).limit(limit)
+        ))
+
+    @staticmethod
+    def get_last_id(db: Session) -> int:
+        return db.scalar(select(FeedEvent.id).order_by(FeedEvent.id.desc()).limit(1)) or 0
+
+    @staticmethod
+    def prune(db: Session, retention_hours: float) -> int:
+        """
+        Borra eventos más viejos que la retención (no se pueden reanudar).
+        Conserva siempre el último: en tablas creadas sin AUTOINCREMENT, SQLite
+        reutilizaría los ids desde 1 si la tabla quedara vacía.
+        """
+        cutoff = datetime.utcnow() - timedelta(hours=retention_hours)
+        last_id = FeedService.get_last_id(db)
+        deleted = db.execute(
+            delete(FeedEvent).where(FeedEvent.created_at < cutoff, FeedEvent.id < last_id)
+        ).rowcount
+        db.commit()
+        return deleted
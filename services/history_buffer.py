@@ -0,0 +1,193 @@
+"""
+Buffer write-behind del historial de mensajes.
+Acumula filas de messages_history y las inserta en bloque (executemany) al
+llegar a HISTORY_FLUSH_MAX_ROWS o cada HISTORY_FLUSH_INTERVAL segundos, en
+lugar de un commit por mensaje. Al apagar se fuerza un último flush.
+
+HISTORY_WRITE_MODE=sync (el valor por defecto) desactiva el buffer: el
+historial se escribe dentro de la transacción de cada mensaje, sin riesgo de
+perder las filas pendientes si el proceso muere. En modo buffered esas filas
+son también el registro de deduplicación, así que un reenvío de Meta tras una
+caída se procesa de nuevo.
+
+Si un insert en bloque falla se reintenta fila por fila: las filas inválidas
+se descartan (con log) y solo las que fallan por un error transitorio vuelven
+al buffer. Con más de HISTORY_BUFFER_MAX_PENDING filas pendientes el buffer
+deja de aceptar filas y los mensajes se guardan como en modo sync.
+"""
+import asyncio
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
+from database.database import engine, run_db
+from database.models import MessagesHistory, Platform
+from utils.logger import app_logger
+from config import settings
+
+
+def _insert_ignoring_duplicates():
+    """INSERT que omite filas con un message_id ya guardado (índice único)."""
+    table = MessagesHistory.__table__
+    if engine.dialect.name == "sqlite":
+        return sqlite.insert(table).on_conflict_do_nothing(index_elements=["message_id"])
+    if engine.dialect.name == "postgresql":
+        return postgresql.insert(table).on_conflict_do_nothing(index_elements=["message_id"])
+    return insert(table)
+
+
+class HistoryWriteBuffer:
+    """
+    Buffer de filas de historial con flush por tamaño o por tiempo.
+    add() y contains() son seguros desde cualquier thread (el pool de la BD
+    los llama dentro de la unidad de trabajo de cada mensaje).
+    """
+
+    def __init__(self, mode: str, max_rows: int, interval: float, max_pending: int):
+        self.mode = mode
+        self.max_rows = max_rows
+        self.interval = interval
+        self.max_pending = max_pending
+        self._rows: List[Dict[str, Any]] = []
+        self._message_ids = set()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self.flushed_rows = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.dropped_rows = 0
+
+    @property
+    def enabled(self) -> bool:
+        """
+        True si el historial se escribe en diferido (modo buffered, iniciado y
+        por debajo de max_pending filas pendientes).
+        """
+        return self.mode == "buffered" and self._task is not None and len(self._rows) < self.max_pending
+
+    async def start(self):
+        """Lanza la tarea de flush periódico si el modo es buffered."""
+        if self.mode != "buffered":
+            app_logger.info("Historial en modo sync: un insert por mensaje dentro de su transacción")
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._flusher(), name="history-flusher")
+        app_logger.info(f"Buffer de historial iniciado: max_rows={self.max_rows}, interval={self.interval}s")
+
+    async def stop(self):
+        """Detiene la tarea periódica y fuerza el flush de las filas pendientes."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        await self.flush()
+        if self._rows:
+            app_logger.error(f"Buffer de historial detenido con {len(self._rows)} filas sin guardar")
+        app_logger.info("Buffer de historial detenido")
+
+    def add(self, platform: Platform, customer_id: str, message_text: str, is_from_customer: bool = True, message_id: Optional[str] = None):
+        """Encola una fila; si se alcanza max_rows despierta al flusher."""
+        row = {
+            "platform": platform,
+            "customer_id": customer_id,
+            "message_text": message_text,
+            "is_from_customer": is_from_customer,
+            "message_id": message_id,
+            "timestamp": datetime.utcnow(),
+        }
+        with self._lock:
+            self._rows.append(row)
+            if message_id:
+                self._message_ids.add(message_id)
+            full = len(self._rows) >= self.max_rows
+        if full and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def contains(self, message_id: str) -> bool:
+        """Indica si un ID de mensaje está pendiente de guardar."""
+        with self._lock:
+            return message_id in self._message_ids
+
+    async def flush(self):
+        """Inserta en bloque todas las filas pendientes."""
+        async with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return
+            dropped = self.dropped_rows
+            try:
+                await run_db(self._insert, rows)
+                retry = []
+            except Exception as e:
+                self.failed_flushes += 1
+                app_logger.error(f"Error guardando {len(rows)} filas de historial, se reintenta fila por fila: {e}")
+                retry = await run_db(self._insert_one_by_one, rows)
+            if retry:
+                # Error transitorio: se reintentan en el próximo flush, delante de las nuevas
+                with self._lock:
+                    self._rows = retry + self._rows
+            with self._lock:
+                self._message_ids.difference_update(row["message_id"] for row in rows)
+                self._message_ids.update(row["message_id"] for row in retry if row["message_id"])
+            self.flushes += 1
+            self.flushed_rows += len(rows) - len(retry) - (self.dropped_rows - dropped)
+
+    @staticmethod
+    def _insert(rows: List[Dict[str, Any]]):
+        with engine.begin() as conn:
+            conn.execute(_insert_ignoring_duplicates(), rows)
+
+    def _insert_one_by_one(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Inserta cada fila en su propia transacción para aislar las inválidas.
+
+        Returns:
+            Filas que fallaron por un error transitorio (a reintentar)
+        """
+        retry = []
+        for row in rows:
+            try:
+                self._insert([row])
+            except (IntegrityError, DataError) as e:
+                self.dropped_rows += 1
+                app_logger.error(f"Fila de historial descartada ({row['platform']}, {row['customer_id']}, {row['message_id']}): {e}")
+            except Exception:
+                retry.append(row)
+        return retry
+
+    async def _flusher(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Filas pendientes y totales de flush."""
+        return {
+            "mode": self.mode,
+            "pending": len(self._rows),
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "failed_flushes": self.failed_flushes,
+            "dropped_rows": self.dropped_rows
+        }
+
+
+history_buffer = HistoryWriteBuffer(
+    mode=settings.history_write_mode,
+    max_rows=settings.history_flush_max_rows,
+    interval=settings.history_flush_interval,
+    max_pending=settings.history_buffer_max_pending
+)
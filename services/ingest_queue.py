@@ -0,0 +1,249 @@
+"""
+Cola de ingesta de webhooks en segundo plano.
+Los routers solo normalizan el payload (services.platform_adapters) y encolan
+el lote de InboundEvent; un pool de workers asyncio procesa los mensajes y
+los escribe en la base de datos junto con la respuesta, que envía el worker
+del outbox.
+
+Los eventos se agrupan por cliente (plataforma + remitente): los mensajes de
+un mismo cliente se procesan de a uno y en orden de llegada, y los de
+clientes distintos en paralelo, hasta INGEST_WORKERS a la vez.
+
+Control de admisión:
+- Presupuesto global (INGEST_QUEUE_SIZE, encolados + en proceso): si el lote
+  no entra se responde 503 y Meta lo reintenta más tarde.
+- Tope por cliente (INGEST_CUSTOMER_MAX_PENDING): lo que exceda se descarta,
+  para que un cliente que inunda no deje sin turno al resto.
+- Modo degradado (INGEST_DEGRADED_THRESHOLD): con ese atraso los mensajes se
+  siguen guardando (historial, reservas, avisos al agente) y la respuesta
+  automática se guarda en el outbox, en la misma transacción, pero retenida
+  (HELD) hasta que el atraso baja a la mitad del umbral. Al liberarlas, de
+  las respuestas generales solo se envía la última de cada cliente; las de
+  reserva y agente se envían todas. Las retenidas sobreviven a una caída y se
+  liberan al arrancar.
+"""
+import asyncio
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, Any, List, Optional, Tuple
+from database import SessionLocal, run_db
+from services.message_processor import message_processor
+from services.outbox_service import OutboxService
+from services.platform_adapters import InboundEvent, ignored_events
+from utils.logger import app_logger
+from config import settings
+
+CustomerKey = Tuple[str, str]
+
+
+class IngestQueue:
+    """
+    Cola asyncio con un pool de workers configurable.
+    Cada cliente tiene su propia cola FIFO; _ready contiene los clientes con
+    mensajes pendientes y ningún worker asignado, así un cliente nunca está
+    en dos workers a la vez y uno con muchos mensajes no bloquea al resto.
+    Se inicia y se drena desde el lifespan de la aplicación.
+    """
+
+    def __init__(self, workers: int, maxsize: int, customer_max_pending: int = 0, degraded_threshold: int = 0):
+        self.workers = workers
+        self.maxsize = maxsize
+        self.customer_max_pending = customer_max_pending
+        self.degraded_threshold = degraded_threshold
+        self._degraded = False
+        self._ready: Optional[asyncio.Queue] = None
+        self._pending: Dict[CustomerKey, Deque[InboundEvent]] = {}
+        self._depth = 0
+        self._tasks: List[asyncio.Task] = []
+        self._busy = 0
+        self._busy_seconds = 0.0
+        self._started_at: Optional[float] = None
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.shed: Counter = Counter()
+
+    async def start(self):
+        """Crea la cola, libera respuestas retenidas antes de una caída y lanza los workers."""
+        await self._release_held()
+        self._ready = asyncio.Queue()
+        self._started_at = time.monotonic()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"ingest-worker-{i}")
+            for i in range(self.workers)
+        ]
+        app_logger.info(f"Cola de ingesta iniciada: workers={self.workers}, maxsize={self.maxsize}")
+
+    async def stop(self, timeout: float):
+        """Espera a que se vacíe la cola (hasta `timeout` segundos) y detiene los workers."""
+        if self._ready is None:
+            return
+        try:
+            await asyncio.wait_for(self._ready.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            app_logger.warning(f"Cola de ingesta no drenada a tiempo: {self._depth} mensajes pendientes")
+        await self._release_held()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        app_logger.info("Cola de ingesta detenida")
+
+    def enqueue(self, event: InboundEvent) -> bool:
+        """
+        Encola un mensaje sin bloquear.
+
+        Returns:
+            False si la cola está llena o no se ha iniciado
+        """
+        return self.enqueue_batch((event,))
+
+    def enqueue_batch(self, events: List[InboundEvent]) -> bool:
+        """
+        Encola todos los mensajes de un webhook sin bloquear, o ninguno:
+        si no caben, Meta reintenta el payload completo y no quedan
+        mensajes procesados a medias. Los que superan el tope por cliente
+        se descartan sin rechazar el resto del lote.
+
+        Returns:
+            False si la cola no tiene lugar para el lote o no se ha iniciado
+        """
+        if self._ready is None:
+            app_logger.error("Cola de ingesta no iniciada")
+            self.rejected += len(events)
+            return False
+        if self.customer_max_pending:
+            events = self._admit_per_customer(events)
+        if self.maxsize and self._depth + self._busy + len(events) > self.maxsize:
+            app_logger.warning(f"Cola de ingesta llena, {len(events)} mensaje(s) rechazado(s)")
+            self.rejected += len(events)
+            self.shed["queue_full"] += len(events)
+            return False
+        for event in events:
+            key = (event.platform.value, event.sender)
+            queue = self._pending.get(key)
+            if queue is None:
+                # Cliente sin mensajes pendientes ni worker asignado
+                queue = self._pending[key] = deque()
+                self._ready.put_nowait(key)
+            queue.append(event)
+        self._depth += len(events)
+        return True
+
+    def _admit_per_customer(self, events: List[InboundEvent]) -> List[InboundEvent]:
+        """Filtra los mensajes de clientes que ya tienen el máximo pendiente."""
+        admitted = []
+        counts: Counter = Counter()
+        for event in events:
+            key = (event.platform.value, event.sender)
+            if counts[key] == 0 and key in self._pending:
+                counts[key] = len(self._pending[key])
+            if counts[key] >= self.customer_max_pending:
+                self.shed["customer_flood"] += 1
+                continue
+            counts[key] += 1
+            admitted.append(event)
+        if len(admitted) < len(events):
+            app_logger.warning(f"Tope por cliente alcanzado, {len(events) - len(admitted)} mensaje(s) descartado(s)")
+        return admitted
+
+    async def _update_mode(self):
+        """Entra en modo degradado al superar el umbral y sale (con histéresis) a la mitad."""
+        if not self.degraded_threshold:
+            return
+        if not self._degraded and self._depth >= self.degraded_threshold:
+            self._degraded = True
+            app_logger.warning(f"Cola de ingesta en modo degradado: {self._depth} mensajes pendientes, respuestas pospuestas")
+        elif self._degraded and self._depth <= self.degraded_threshold // 2:
+            self._degraded = False
+            app_logger.info("Cola de ingesta en modo normal, liberando respuestas retenidas")
+            await self._release_held()
+
+    async def _release_held(self):
+        released, coalesced = await run_db(self._release_held_sync)
+        self.shed["reply_coalesced"] += coalesced
+        if released or coalesced:
+            app_logger.info(f"Respuestas retenidas: {released} liberada(s), {coalesced} reemplazada(s)")
+
+    @staticmethod
+    def _release_held_sync() -> Tuple[int, int]:
+        db = SessionLocal()
+        try:
+            return OutboxService.release_held(db)
+        finally:
+            db.close()
+
+    async def _worker(self):
+        while True:
+            key = await self._ready.get()
+            queue = self._pending[key]
+            event = queue.popleft()
+            self._depth -= 1
+            self._busy += 1
+            started = time.monotonic()
+            try:
+                await self._update_mode()
+                await self._handle(event, self._degraded)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                app_logger.error(f"Error procesando mensaje de {event.sender} ({event.platform.value}): {e}")
+            finally:
+                self._busy -= 1
+                self._busy_seconds += time.monotonic() - started
+                # El siguiente mensaje del cliente vuelve al final de la fila
+                # (turno para los demás); sin pendientes se libera el cliente
+                if queue:
+                    self._ready.put_nowait(key)
+                else:
+                    del self._pending[key]
+                self._ready.task_done()
+
+    async def _handle(self, event: InboundEvent, degraded: bool = False):
+        db = SessionLocal()
+        try:
+            result = await message_processor.process_message(
+                db=db,
+                platform=event.platform,
+                customer_id=event.sender,
+                customer_name=event.name,
+                message_text=event.text,
+                message_id=event.message_id,
+                hold_reply=degraded
+            )
+        finally:
+            await run_db(db.close)
+        if not (degraded and result.get("response_message")):
+            return
+        self.shed["reply_held"] += 1
+        if not self._degraded:
+            # Otro worker salió del modo degradado (y liberó las retenidas)
+            # mientras se procesaba este mensaje: se libera también esta
+            await self._release_held()
+
+    def stats(self) -> Dict[str, Any]:
+        """Profundidad de la cola y utilización de los workers."""
+        uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            "depth": self._depth,
+            "customers": len(self._pending),
+            "maxsize": self.maxsize,
+            "workers": self.workers,
+            "busy_workers": self._busy,
+            "utilization": round(self._busy / self.workers, 3) if self.workers else 0.0,
+            "avg_utilization": round(self._busy_seconds / (uptime * self.workers), 3) if uptime and self.workers else 0.0,
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "degraded": self._degraded,
+            "shed": dict(self.shed),
+            "ignored": dict(ignored_events)
+        }
+
+
+ingest_queue = IngestQueue(
+    workers=settings.ingest_workers,
+    maxsize=settings.ingest_queue_size,
+    customer_max_pending=settings.ingest_customer_max_pending,
+    degraded_threshold=settings.ingest_degraded_threshold
+)
@@ -0,0 +1,136 @@
+"""
+Caché de la base de conocimientos del restaurante (restaurant_info.json).
+Se recarga sola cuando cambia el archivo y precalcula en cada carga las
+respuestas estáticas y el índice de FAQs. El snapshot se reemplaza de forma
+atómica, así que las lecturas no toman ningún lock. La comprobación y la
+recarga corren en una tarea de fondo (iniciada desde el lifespan) y en un
+thread, nunca en el camino de cada mensaje.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+from utils.faq_index import FAQIndex
+from utils.logger import app_logger
+from config import settings
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+FALLBACK_REPLY = "Lo siento, no tengo esa información específica. ¿Te gustaría que te comunique con un agente?"
+
+
+@dataclass(frozen=True)
+class KnowledgeSnapshot:
+    """Versión inmutable de la base de conocimientos ya procesada."""
+    info: Dict[str, Any]
+    replies: Dict[str, Optional[str]]
+    faq_index: FAQIndex
+    digest: str
+    mtime: float
+
+
+def build_snapshot(info: Dict[str, Any], digest: str = "", mtime: float = 0.0) -> KnowledgeSnapshot:
+    """Precalcula las respuestas estáticas y el índice de FAQs."""
+    examples = info.get("message_examples", {})
+    schedule = info.get("schedule", {})
+    sched_str = "\n".join([f"- {d.capitalize()}: {h}" for d, h in schedule.items()])
+    replies = {
+        "greeting": examples.get("greeting", "¡Hola!"),
+        "location": f"Estamos ubicados en: {info.get('location')}",
+        "schedule": f"Nuestros horarios son:\n{sched_str}",
+        "agent_requested": examples.get("agent_requested"),
+        "reservation_detected": examples.get("reservation_detected"),
+        "fallback": FALLBACK_REPLY,
+    }
+    return KnowledgeSnapshot(
+        info=info,
+        replies=replies,
+        faq_index=FAQIndex(info.get("faqs", [])),
+        digest=digest,
+        mtime=mtime
+    )
+
+
+class KnowledgeBase:
+    """
+    Base de conocimientos con recarga en caliente.
+    Cada `check_interval` segundos la tarea de fondo hace un stat() del
+    archivo; si cambió el mtime y también el hash del contenido se reconstruye
+    el snapshot.
+    """
+
+    def __init__(self, path: str, check_interval: float):
+        self.path = path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+        self.check_interval = check_interval
+        self._snapshot = build_snapshot({})
+        self._reload_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.reload()
+
+    @property
+    def snapshot(self) -> KnowledgeSnapshot:
+        """Snapshot vigente (sin I/O)."""
+        return self._snapshot
+
+    async def start(self):
+        """Lanza la tarea que vigila el archivo."""
+        self._task = asyncio.create_task(self._watch(), name="knowledge-base-watcher")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _watch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await loop.run_in_executor(None, self.reload)
+            except Exception as e:
+                app_logger.error(f"Error comprobando la base de conocimientos: {e}")
+
+    def reload(self, force: bool = False):
+        """Recarga el archivo si cambió. Si otro hilo ya está recargando, no espera."""
+        if not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            self._reload(force)
+        finally:
+            self._reload_lock.release()
+
+    def _reload(self, force: bool):
+        current = self._snapshot
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            if current.digest:
+                app_logger.warning(f"Base de conocimientos no encontrada: {self.path}")
+            return
+        if not force and mtime == current.mtime:
+            return
+
+        try:
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+            digest = hashlib.sha256(raw).hexdigest()
+            if not force and digest == current.digest:
+                self._snapshot = KnowledgeSnapshot(current.info, current.replies, current.faq_index, digest, mtime)
+                return
+            info = json.loads(raw).get("restaurant", {})
+            snapshot = build_snapshot(info, digest, mtime)
+        except (OSError, ValueError) as e:
+            app_logger.error(f"Error recargando la base de conocimientos, se mantiene la versión anterior: {e}")
+            return
+
+        self._snapshot = snapshot
+        app_logger.info(f"Base de conocimientos cargada: {len(snapshot.faq_index)} FAQs ({digest[:8]})")
+
+
+# Instancia global
+knowledge_base = KnowledgeBase(settings.knowledge_base_path, settings.knowledge_base_check_interval)
@@ -6,8 +6,17 @@ from database.models import MessagesHistory, Platform
 
 class MessageHistoryService:
     @staticmethod
-    def save_message(db: Session, platform: Platform, customer_id: str, message_text: str, is_from_customer: bool = True, message_id: str = None):
+    def save_message(db: Session, platform: Platform, customer_id: str, message_text: str, is_from_customer: bool = True, message_id: str = None, commit: bool = True):
+        """Con commit=False solo hace flush: el llamador confirma la transacción."""
         message = MessagesHistory(platform=platform, customer_id=customer_id, message_text=message_text, is_from_customer=is_from_customer, message_id=message_id)
         db.add(message)
-        db.commit()
+        if commit:
+            db.commit()
+        else:
+            db.flush()
         return message
+
+    @staticmethod
+    def exists(db: Session, message_id: str) -> bool:
+        """Indica si ya se guardó un mensaje con ese ID de plataforma."""
+        return db.query(MessagesHistory.id).filter(MessagesHistory.message_id == message_id).first() is not None
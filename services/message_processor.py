@@ -2,17 +2,21 @@
 Procesador de mensajes con Inteligencia Artificial.
 Gestiona la lógica de conversación, detección de intenciones y consultas a la base de conocimientos.
 """
-import json
-import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, FrozenSet, Tuple
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from database.database import run_db
 from database.models import Platform
 from utils.entity_extractor import EntityExtractor
+from utils.intent_matcher import intent_matcher
 from utils.logger import app_logger
 from services.reservation_service import ReservationService
 from services.notification_service import NotificationService
 from services.message_history_service import MessageHistoryService
-from services.meta_api_client import meta_api_client
+from services.outbox_service import OutboxService, KIND_AGENT_ALERT
+from services.dedupe_cache import dedupe_cache, dedupe_key
+from services.history_buffer import history_buffer
+from services.knowledge_base import knowledge_base, KnowledgeSnapshot
 from config import settings
 
 class MessageProcessor:
@@ -21,49 +25,39 @@ class MessageProcessor:
     Próximamente integrará un modelo LLM (GPT-4/Gemini) para respuestas fluidas.
     """
     
-    def __init__(self):
-        self.kb_path = "restaurant_info.json"
-        self.restaurant_info = self._load_knowledge_base()
-
-    def _load_knowledge_base(self) -> Dict:
-        """Carga la información del restaurante desde el JSON."""
-        if os.path.exists(self.kb_path):
-            with open(self.kb_path, 'r', encoding='utf-8') as f:
-                return json.load(f).get("restaurant", {})
-        return {}
-
-    def _generate_ai_response(self, message_text: str) -> str:
+    def _generate_ai_response(
+        self,
+        message_text: str,
+        intents: Optional[FrozenSet[str]] = None,
+        kb: Optional[KnowledgeSnapshot] = None
+    ) -> str:
         """
         Lógica de respuesta basada en la base de conocimientos.
         Busca coincidencias en la configuración general y en la lista de FAQs.
         """
-        msg = message_text.lower()
+        if intents is None:
+            intents = intent_matcher.match(message_text)
+        if kb is None:
+            kb = knowledge_base.snapshot
         
         # 1. Saludos
-        if any(k in msg for k in ["hola", "buenos dias", "buenas tardes", "buenas noches"]):
-            return self.restaurant_info.get("message_examples", {}).get("greeting", "¡Hola!")
+        if "greeting" in intents:
+            return kb.replies["greeting"]
 
         # 2. Ubicación
-        if any(k in msg for k in ["donde", "ubicacion", "ubicación", "llegar", "direccion", "dirección"]):
-            return f"Estamos ubicados en: {self.restaurant_info.get('location')}"
+        if "location" in intents:
+            return kb.replies["location"]
         
         # 3. Horarios
-        if any(k in msg for k in ["horario", "abren", "hora", "cuándo", "cuando"]):
-            schedule = self.restaurant_info.get("schedule", {})
-            sched_str = "\n".join([f"- {d.capitalize()}: {h}" for d, h in schedule.items()])
-            return f"Nuestros horarios son:\n{sched_str}"
-
-        # 4. Buscar en la lista de FAQs del JSON
-        faqs = self.restaurant_info.get("faqs", [])
-        for faq in faqs:
-            # Si alguna palabra significativa de la pregunta está en el mensaje
-            question_text = faq.get("question", "").lower()
-            # Dividir en palabras y filtrar conectores cortos
-            keywords = [w for w in question_text.split() if len(w) > 3]
-            if any(k in msg for k in keywords):
-                return faq.get("answer")
-
-        return "Lo siento, no tengo esa información específica. ¿Te gustaría que te comunique con un agente?"
+        if "schedule" in intents:
+            return kb.replies["schedule"]
+
+        # 4. Buscar en el índice de FAQs (mejor coincidencia por encima del umbral)
+        answer = kb.faq_index.best_answer(message_text, settings.faq_min_score)
+        if answer:
+            return answer
+
+        return kb.replies["fallback"]
 
     async def process_message(
         self,
@@ -72,63 +66,161 @@ class MessageProcessor:
         customer_id: str,
         customer_name: Optional[str],
         message_text: str,
-        message_id: Optional[str] = None
+        message_id: Optional[str] = None,
+        hold_reply: bool = False
     ) -> Dict[str, Any]:
-        """Procesa un mensaje entrante de cualquier plataforma."""
+        """
+        Procesa un mensaje entrante de cualquier plataforma.
+        La respuesta y los avisos al agente se guardan en el outbox junto con
+        el mensaje; con hold_reply=True la respuesta queda retenida hasta
+        OutboxService.release_held (modo degradado de la cola de ingesta).
+        """
         
-        # 1. Guardar en historial
-        MessageHistoryService.save_message(
-            db=db, platform=platform, customer_id=customer_id,
-            message_text=message_text, is_from_customer=True, message_id=message_id
-        )
+        # 0. Descartar reintentos de Meta (mismo ID de mensaje)
+        key = dedupe_key(platform.value, message_id)
+        if key and dedupe_cache.check_and_add(key):
+            app_logger.info(f"Mensaje duplicado descartado: {message_id}")
+            return {"type": "duplicate", "response_message": None}
+        
+        try:
+            return await self._process_new_message(db, platform, customer_id, customer_name, message_text, message_id, hold_reply)
+        except Exception:
+            if key:
+                dedupe_cache.discard(key)
+            raise
+
+    def _save_inbound(
+        self,
+        db: Session,
+        platform: Platform,
+        customer_id: str,
+        customer_name: Optional[str],
+        message_text: str,
+        message_id: Optional[str],
+        entities: Optional[Dict[str, Any]],
+        outgoing: List[Tuple[Platform, str, str, str, bool]] = ()
+    ) -> bool:
+        """
+        Unidad de trabajo de un mensaje entrante: historial, envíos salientes
+        (outbox) y, si hay entidades, reserva + notificación, con un único commit.
+        Los ids se asignan con flush; ante cualquier error se hace rollback,
+        de modo que nunca queda una reserva sin su notificación.
+        Con el buffer de historial activo, la fila de historial se encola tras
+        el commit en lugar de insertarse aquí.
 
-        msg_lower = message_text.lower()
+        Returns:
+            False si el mensaje ya estaba guardado (duplicado)
+        """
+        try:
+            # El índice único sobre message_id respalda a la caché de deduplicación
+            buffered = history_buffer.enabled
+            if message_id and (
+                (buffered and history_buffer.contains(message_id))
+                or MessageHistoryService.exists(db, message_id)
+            ):
+                app_logger.info(f"Mensaje duplicado descartado (historial): {message_id}")
+                return False
 
-        # 2. Detectar si pide hablar con un agente
-        if any(k in msg_lower for k in ["agente", "hablar con alguien", "ayuda", "persona"]):
+            if not buffered:
+                MessageHistoryService.save_message(
+                    db=db, platform=platform, customer_id=customer_id,
+                    message_text=message_text, is_from_customer=True, message_id=message_id,
+                    commit=False
+                )
+
+            if entities is not None:
+                reservation = ReservationService.create_reservation(
+                    db=db, platform=platform, customer_id=customer_id,
+                    customer_name=customer_name,
+                    reservation_date=entities.get("date"),
+                    reservation_time=entities.get("time"),
+                    party_size=entities.get("party_size"),
+                    notes=message_text,
+                    commit=False
+                )
+                NotificationService.create_notification(
+                    db=db,
+                    message=f"Nueva reserva de {customer_name or 'Cliente'} vía {platform.value}",
+                    reservation_id=reservation.id,
+                    commit=False
+                )
+
+            for out_platform, recipient_id, text, kind, held in outgoing:
+                if text:
+                    OutboxService.add(db, out_platform, recipient_id, text, kind=kind, held=held)
+
+            db.commit()
+            if buffered:
+                history_buffer.add(platform, customer_id, message_text, is_from_customer=True, message_id=message_id)
+            return True
+        except IntegrityError:
+            db.rollback()
+            # Solo el índice único de messages_history.message_id es un duplicado;
+            # cualquier otra restricción es un error real y se propaga
+            if message_id and MessageHistoryService.exists(db, message_id):
+                app_logger.info(f"Mensaje duplicado descartado (índice único): {message_id}")
+                return False
+            raise
+        except Exception:
+            db.rollback()
+            raise
+
+    async def _process_new_message(
+        self,
+        db: Session,
+        platform: Platform,
+        customer_id: str,
+        customer_name: Optional[str],
+        message_text: str,
+        message_id: Optional[str],
+        hold_reply: bool = False
+    ) -> Dict[str, Any]:
+        # Todas las intenciones del mensaje en una sola pasada
+        intents = intent_matcher.match(message_text)
+        kb = knowledge_base.snapshot
+
+        # Solo se crea reserva si no se pidió un agente (el agente tiene prioridad)
+        wants_reservation = "agent" not in intents and "reservation" in intents
+        entities = EntityExtractor.extract_all(message_text) if wants_reservation else None
+
+        outgoing = []
+
+        # 1. Detectar si pide hablar con un agente
+        if "agent" in intents:
             # Notificar al agente vía WhatsApp
             agent_msg = f"⚠️ ATENCIÓN: El cliente {customer_name or customer_id} en {platform.value} solicita hablar con un agente.\n\nÚltimo mensaje: '{message_text}'"
-            try:
-                await meta_api_client.send_whatsapp_message(
-                    recipient_number=settings.agent_whatsapp_number,
-                    message_text=agent_msg
-                )
-            except Exception as e:
-                app_logger.error(f"Error notificando al agente vía WhatsApp: {e}")
+            outgoing.append((Platform.WHATSAPP, settings.agent_whatsapp_number, agent_msg, KIND_AGENT_ALERT, False))
 
-            return {
+            result = {
                 "type": "agent_request",
-                "response_message": self.restaurant_info.get("message_examples", {}).get("agent_requested")
+                "response_message": kb.replies["agent_requested"]
             }
 
-        # 3. Detectar intención de reserva
-        if any(k in msg_lower for k in ["reserva", "mesa", "turno", "cita"]):
-            entities = EntityExtractor.extract_all(message_text)
-            reservation = ReservationService.create_reservation(
-                db=db, platform=platform, customer_id=customer_id,
-                customer_name=customer_name,
-                reservation_date=entities.get("date"),
-                reservation_time=entities.get("time"),
-                party_size=entities.get("party_size"),
-                notes=message_text
-            )
-            
-            NotificationService.create_notification(
-                db=db,
-                message=f"Nueva reserva de {customer_name or 'Cliente'} vía {platform.value}",
-                reservation_id=reservation.id
-            )
-
-            return {
+        # 2. Reserva registrada junto con su notificación
+        elif wants_reservation:
+            result = {
                 "type": "reservation_request",
-                "response_message": self.restaurant_info.get("message_examples", {}).get("reservation_detected")
+                "response_message": kb.replies["reservation_detected"]
             }
 
-        # 4. Respuesta general de la "IA" (Base de conocimientos)
-        return {
-            "type": "knowledge_response",
-            "response_message": self._generate_ai_response(message_text)
-        }
+        # 3. Respuesta general de la "IA" (Base de conocimientos)
+        else:
+            result = {
+                "type": "knowledge_response",
+                "response_message": self._generate_ai_response(message_text, intents, kb)
+            }
+
+        # Sin respuesta configurada (p. ej. falta en la base de conocimientos) no se envía nada
+        if result["response_message"]:
+            outgoing.append((platform, customer_id, result["response_message"], result["type"], hold_reply))
+
+        # 4. Guardar todo en una sola transacción, en el pool de threads de la BD
+        saved = await run_db(
+            self._save_inbound, db, platform, customer_id, customer_name, message_text, message_id, entities, outgoing
+        )
+        if not saved:
+            return {"type": "duplicate", "response_message": None}
+        return result
 
 # Instancia global
 message_processor = MessageProcessor()
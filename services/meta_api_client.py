@@ -1,34 +1,99 @@
 """
 Cliente unificado para las APIs de Meta.
+Usa un único httpx.AsyncClient con pool de conexiones keep-alive (y HTTP/2
+opcional), creado al inicio y cerrado en el shutdown de la aplicación.
 """
+import asyncio
 import httpx
 from typing import Dict, Any, Optional
 from config import settings
+from database.models import Platform
 from utils.logger import app_logger
 
 class MetaAPIClient:
     def __init__(self):
         self.base_url = settings.graph_api_url
-    
-    async def send_instagram_message(self, recipient_id: str, message_text: str):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _build_client(self) -> httpx.AsyncClient:
+        http2 = settings.meta_http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                app_logger.warning("META_HTTP2 activo pero falta el paquete 'h2'; se usa HTTP/1.1")
+                http2 = False
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.meta_max_connections,
+                max_keepalive_connections=settings.meta_max_keepalive_connections,
+                keepalive_expiry=settings.meta_keepalive_expiry
+            ),
+            timeout=httpx.Timeout(settings.meta_timeout, connect=settings.meta_connect_timeout)
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Cliente compartido; se crea bajo demanda si no se llamó a start()."""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    async def start(self):
+        """Crea el pool de conexiones y lo pre-calienta."""
+        self.client
+        await self.warmup(settings.meta_warmup_connections)
+        app_logger.info("Cliente de Meta API iniciado")
+
+    async def warmup(self, connections: int):
+        """
+        Abre `connections` conexiones a Graph API para que el primer envío
+        no pague el handshake TCP+TLS.
+        """
+        if connections <= 0:
+            return
+        results = await asyncio.gather(
+            *[self.client.head(settings.graph_api_base_url) for _ in range(connections)],
+            return_exceptions=True
+        )
+        failed = [r for r in results if isinstance(r, Exception)]
+        if failed:
+            app_logger.warning(f"Pre-calentamiento de conexiones incompleto: {failed[0]}")
+
+    async def close(self):
+        """Cierra el pool de conexiones."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            app_logger.info("Cliente de Meta API cerrado")
+
+    async def _post(self, url: str, payload: Dict[str, Any], access_token: str) -> httpx.Response:
+        headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
+        return await self.client.post(url, json=payload, headers=headers)
+
+    async def send_instagram_message(self, recipient_id: str, message_text: str) -> httpx.Response:
         url = f"{self.base_url}/me/messages"
         payload = {"recipient": {"id": recipient_id}, "message": {"text": message_text}}
-        headers = {"Authorization": f"Bearer {settings.instagram_page_access_token}", "Content-Type": "application/json"}
-        async with httpx.AsyncClient() as client:
-            await client.post(url, json=payload, headers=headers)
+        return await self._post(url, payload, settings.instagram_page_access_token)
 
-    async def send_messenger_message(self, recipient_id: str, message_text: str):
+    async def send_messenger_message(self, recipient_id: str, message_text: str) -> httpx.Response:
         url = f"{self.base_url}/me/messages"
         payload = {"recipient": {"id": recipient_id}, "message": {"text": message_text}}
-        headers = {"Authorization": f"Bearer {settings.messenger_page_access_token}", "Content-Type": "application/json"}
-        async with httpx.AsyncClient() as client:
-            await client.post(url, json=payload, headers=headers)
+        return await self._post(url, payload, settings.messenger_page_access_token)
 
-    async def send_whatsapp_message(self, recipient_number: str, message_text: str):
+    async def send_whatsapp_message(self, recipient_number: str, message_text: str) -> httpx.Response:
         url = f"{self.base_url}/{settings.whatsapp_phone_number_id}/messages"
         payload = {"messaging_product": "whatsapp", "to": recipient_number, "text": {"body": message_text}}
-        headers = {"Authorization": f"Bearer {settings.whatsapp_access_token}", "Content-Type": "application/json"}
-        async with httpx.AsyncClient() as client:
-            await client.post(url, json=payload, headers=headers)
+        return await self._post(url, payload, settings.whatsapp_access_token)
+
+    async def send_message(self, platform: Platform, recipient_id: str, message_text: str) -> httpx.Response:
+        """Envía un mensaje por la plataforma indicada."""
+        if platform == Platform.INSTAGRAM:
+            return await self.send_instagram_message(recipient_id, message_text)
+        elif platform == Platform.MESSENGER:
+            return await self.send_messenger_message(recipient_id, message_text)
+        else:
+            return await self.send_whatsapp_message(recipient_id, message_text)
 
 meta_api_client = MetaAPIClient()
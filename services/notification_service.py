@@ -1,25 +1,72 @@
 """
 Servicio de notificaciones para el agente.
 """
-from typing import List
+from typing import Tuple
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
-from database.models import Notification
+from database.models import Notification, NotificationCounter
 from utils.logger import app_logger
+from services.feed_service import FeedService, NOTIFICATION_CREATED, NOTIFICATIONS_READ
+
+COUNTER_ID = 1  # NotificationCounter es una fila única
 
 
 class NotificationService:
     @staticmethod
-    def create_notification(db: Session, message: str, reservation_id: int = None):
+    def _count_unread(db: Session) -> int:
+        """COUNT(*) sobre notifications; solo como respaldo si falta el contador."""
+        return db.query(Notification).filter(Notification.is_read == False).count()
+
+    @staticmethod
+    def _bump_counter(db: Session, delta: int) -> None:
+        """
+        Suma delta a los no leídos y avanza la versión dentro de la transacción
+        en curso. La fila la crea init_db; si falta se recalcula desde la tabla
+        (el conteo ya incluye lo que esta transacción escribió con flush).
+        """
+        updated = db.execute(
+            update(NotificationCounter)
+            .where(NotificationCounter.id == COUNTER_ID)
+            .values(
+                unread_count=NotificationCounter.unread_count + delta,
+                version=NotificationCounter.version + 1
+            )
+        ).rowcount
+        if not updated:
+            db.add(NotificationCounter(id=COUNTER_ID, unread_count=NotificationService._count_unread(db), version=1))
+            db.flush()
+
+    @staticmethod
+    def create_notification(db: Session, message: str, reservation_id: int = None, commit: bool = True):
+        """Con commit=False solo hace flush: el llamador confirma la transacción."""
         notification = Notification(message=message, reservation_id=reservation_id, is_read=False)
         db.add(notification)
-        db.commit()
-        db.refresh(notification)
+        db.flush()
+        NotificationService._bump_counter(db, 1)
+        FeedService.record(db, NOTIFICATION_CREATED, {
+            "id": notification.id,
+            "message": message,
+            "reservation_id": reservation_id
+        })
+        if commit:
+            db.commit()
+            db.refresh(notification)
         app_logger.info(f"Notificación creada: ID={notification.id}")
         return notification
 
     @staticmethod
     def mark_all_as_read(db: Session):
-        db.query(Notification).filter(Notification.is_read == False).update({"is_read": True})
+        # Primero se bloquea el contador: una notificación creada en paralelo
+        # espera a este commit en lugar de quedar fuera del descuento.
+        NotificationService._bump_counter(db, 0)
+        marked = db.query(Notification).filter(Notification.is_read == False).update({"is_read": True})
+        if marked:
+            db.execute(
+                update(NotificationCounter)
+                .where(NotificationCounter.id == COUNTER_ID)
+                .values(unread_count=NotificationCounter.unread_count - marked)
+            )
+            FeedService.record(db, NOTIFICATIONS_READ, {"marked": marked})
         db.commit()
 
     @staticmethod
@@ -27,5 +74,21 @@ class NotificationService:
         return db.query(Notification).filter(Notification.is_read == False).order_by(Notification.created_at.desc()).all()
 
     @staticmethod
-    def get_unread_count(db: Session):
-        return db.query(Notification).filter(Notification.is_read == False).count()
+    def get_unread_state(db: Session) -> Tuple[int, int]:
+        """
+        Lectura O(1) del contador por clave primaria.
+
+        Returns:
+            (no leídas, versión); la versión cambia con cada alta o lectura
+        """
+        row = db.execute(
+            select(NotificationCounter.unread_count, NotificationCounter.version)
+            .where(NotificationCounter.id == COUNTER_ID)
+        ).first()
+        if row is None:
+            return NotificationService._count_unread(db), 0
+        return row.unread_count, row.version
+
+    @staticmethod
+    def get_unread_count(db: Session) -> int:
+        return NotificationService.get_unread_state(db)[0]
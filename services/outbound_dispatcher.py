@@ -0,0 +1,250 @@
+"""
+Despachador de mensajes salientes hacia Graph API.
+Cada plataforma/remitente (página de Instagram, página de Messenger, número
+de WhatsApp) tiene su propio carril con token bucket y workers, de modo que
+el throttling de una página no bloquea el tráfico de las demás.
+Reintenta 429 y 5xx con backoff exponencial, jitter y respeto de Retry-After.
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+import httpx
+from database.models import Platform
+from services.meta_api_client import meta_api_client
+from utils.logger import app_logger
+from config import settings
+
+
+class TokenBucket:
+    """
+    Token bucket asíncrono.
+    `rate` tokens por segundo con ráfagas de hasta `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def block_for(self, seconds: float):
+        """Pausa el bucket (p. ej. tras un 429 con Retry-After)."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> bool:
+        """
+        Espera hasta obtener un token.
+
+        Returns:
+            True si hubo que esperar (envío limitado)
+        """
+        waited = False
+        while True:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                waited = True
+                await asyncio.sleep(self.blocked_until - now)
+                continue
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return waited
+            waited = True
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+@dataclass
+class OutboundMessage:
+    platform: Platform
+    recipient_id: str
+    message_text: str
+    future: asyncio.Future
+
+
+@dataclass
+class _Lane:
+    key: Tuple[str, str]
+    bucket: TokenBucket
+    queue: asyncio.Queue
+    tasks: List[asyncio.Task] = field(default_factory=list)
+
+
+class OutboundDispatcher:
+    """
+    Encola envíos salientes y los entrega de forma asíncrona por carriles.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        lane_concurrency: int,
+        queue_size: int,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.lane_concurrency = lane_concurrency
+        self.queue_size = queue_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lanes: Dict[Tuple[str, str], _Lane] = {}
+        self._running = False
+        self.counters = {"sent": 0, "failed": 0, "dropped": 0, "throttled": 0, "retried": 0}
+
+    @staticmethod
+    def _sender_key(platform: Platform) -> Tuple[str, str]:
+        """Identifica el remitente que Meta usa para limitar la tasa."""
+        if platform == Platform.WHATSAPP:
+            return (platform.value, settings.whatsapp_phone_number_id)
+        return (platform.value, "page")
+
+    async def start(self):
+        self._running = True
+        app_logger.info(f"Despachador saliente iniciado: rate={self.rate}/s, burst={self.burst}")
+
+    async def stop(self, timeout: float):
+        """Espera a que se vacíen los carriles y detiene sus workers."""
+        self._running = False
+        lanes = list(self._lanes.values())
+        try:
+            await asyncio.wait_for(asyncio.gather(*[lane.queue.join() for lane in lanes]), timeout=timeout)
+        except asyncio.TimeoutError:
+            pending = sum(lane.queue.qsize() for lane in lanes)
+            app_logger.warning(f"Despachador saliente no drenado a tiempo: {pending} envíos pendientes")
+        tasks = [task for lane in lanes for task in lane.tasks]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._lanes = {}
+        app_logger.info("Despachador saliente detenido")
+
+    def _lane(self, platform: Platform) -> _Lane:
+        key = self._sender_key(platform)
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = _Lane(key=key, bucket=TokenBucket(self.rate, self.burst), queue=asyncio.Queue(maxsize=self.queue_size))
+            lane.tasks = [
+                asyncio.create_task(self._lane_worker(lane), name=f"outbound-{key[0]}-{i}")
+                for i in range(self.lane_concurrency)
+            ]
+            self._lanes[key] = lane
+        return lane
+
+    def submit(self, platform: Platform, recipient_id: str, message_text: str) -> asyncio.Future:
+        """
+        Encola un envío sin bloquear.
+
+        Returns:
+            Future que se resuelve a True si el mensaje se entregó
+        """
+        future = asyncio.get_running_loop().create_future()
+        if not self._running:
+            app_logger.error("Despachador saliente no iniciado, envío descartado")
+            self.counters["dropped"] += 1
+            future.set_result(False)
+            return future
+        try:
+            self._lane(platform).queue.put_nowait(OutboundMessage(platform, recipient_id, message_text, future))
+        except asyncio.QueueFull:
+            app_logger.warning(f"Carril saliente {platform.value} lleno, envío descartado")
+            self.counters["dropped"] += 1
+            future.set_result(False)
+        return future
+
+    async def _lane_worker(self, lane: _Lane):
+        while True:
+            message = await lane.queue.get()
+            try:
+                delivered = await self._deliver(lane, message)
+            except Exception as e:
+                app_logger.error(f"Error inesperado enviando a {message.recipient_id}: {e}")
+                delivered = False
+            finally:
+                lane.queue.task_done()
+            self.counters["sent" if delivered else "failed"] += 1
+            if not message.future.done():
+                message.future.set_result(delivered)
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[float]:
+        value = response.headers.get("Retry-After")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return None
+
+    async def _deliver(self, lane: _Lane, message: OutboundMessage) -> bool:
+        for attempt in range(self.max_retries + 1):
+            if await lane.bucket.acquire():
+                self.counters["throttled"] += 1
+
+            retry_after = None
+            try:
+                response = await meta_api_client.send_message(message.platform, message.recipient_id, message.message_text)
+            except httpx.HTTPError as e:
+                reason = f"{type(e).__name__}: {e}"
+            else:
+                if response.status_code < 400:
+                    return True
+                if response.status_code != 429 and response.status_code < 500:
+                    app_logger.error(
+                        f"Envío rechazado por {message.platform.value} ({response.status_code}): {response.text[:200]}"
+                    )
+                    return False
+                reason = f"HTTP {response.status_code}"
+                retry_after = self._retry_after(response)
+                if response.status_code == 429:
+                    self.counters["throttled"] += 1
+                    lane.bucket.block_for(retry_after if retry_after is not None else self._backoff(attempt, None))
+
+            if attempt == self.max_retries:
+                break
+            delay = self._backoff(attempt, retry_after)
+            self.counters["retried"] += 1
+            app_logger.warning(
+                f"Reintentando envío a {message.recipient_id} vía {message.platform.value} "
+                f"en {delay:.2f}s ({reason}, intento {attempt + 1}/{self.max_retries})"
+            )
+            await asyncio.sleep(delay)
+
+        app_logger.error(f"Envío a {message.recipient_id} vía {message.platform.value} fallido tras {self.max_retries} reintentos")
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores globales y profundidad de cada carril."""
+        return {
+            **self.counters,
+            "lanes": {
+                ":".join(key): {"depth": lane.queue.qsize(), "tokens": round(lane.bucket.tokens, 2)}
+                for key, lane in self._lanes.items()
+            }
+        }
+
+
+outbound_dispatcher = OutboundDispatcher(
+    rate=settings.outbound_rate_per_second,
+    burst=settings.outbound_burst,
+    lane_concurrency=settings.outbound_lane_concurrency,
+    queue_size=settings.outbound_queue_size,
+    max_retries=settings.outbound_max_retries,
+    backoff_base=settings.outbound_backoff_base,
+    backoff_max=settings.outbound_backoff_max
+)
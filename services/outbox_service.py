@@ -0,0 +1,170 @@
+"""
+Acceso a la tabla outbox (mensajes salientes pendientes de envío).
+Los servicios llaman a OutboxService.add dentro de su transacción; el envío
+solo existe si el cambio se confirma. OutboxWorker reclama, envía y marca.
+"""
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import Row, case, func, literal, select, update
+from sqlalchemy.orm import Session
+from database.models import OutboxMessage, OutboxStatus, Platform
+
+# Marca en session.info: la transacción escribió en el outbox (ver OutboxWorker)
+PENDING_FLAG = "outbox_pending"
+
+KIND_AGENT_ALERT = "agent_alert"
+# Envíos que aún no terminaron: el más antiguo de cada destinatario va primero
+ACTIVE_STATUSES = (OutboxStatus.PENDING, OutboxStatus.SENDING, OutboxStatus.HELD)
+
+# Respuestas retenidas que se pueden reemplazar por una más reciente del mismo
+# cliente; las confirmaciones de reserva y de agente se envían siempre
+COALESCIBLE_KINDS = ("knowledge_response",)
+
+
+class OutboxService:
+    @staticmethod
+    def add(
+        db: Session,
+        platform: Platform,
+        recipient_id: str,
+        message_text: str,
+        kind: Optional[str] = None,
+        held: bool = False
+    ) -> OutboxMessage:
+        """
+        Agrega un envío a la transacción en curso (sin commit).
+        Con held=True queda retenido hasta release_held (modo degradado).
+        """
+        message = OutboxMessage(
+            platform=platform, recipient_id=recipient_id, message_text=message_text, kind=kind,
+            status=OutboxStatus.HELD if held else OutboxStatus.PENDING
+        )
+        db.add(message)
+        db.info[PENDING_FLAG] = True
+        return message
+
+    @staticmethod
+    def claim_batch(db: Session, limit: int, lease: float, platform: Optional[Platform] = None) -> List[Row]:
+        """
+        Reclama hasta `limit` envíos vencidos (de `platform`, si se indica),
+        en orden de creación, y los pasa a SENDING con commit.
+        De cada destinatario solo se reclama su envío activo más antiguo: el
+        siguiente espera a que ese quede registrado como enviado o fallido
+        (incluidos sus reintentos), así los mensajes llegan en orden.
+        Es un único UPDATE: si otro proceso reclama las mismas filas, cada una
+        queda para uno solo. next_attempt_at pasa a ser el vencimiento del
+        reclamo (`lease` segundos), ver release_expired.
+
+        Returns:
+            Filas (id, platform, recipient_id, message_text), válidas fuera de la sesión
+        """
+        now = datetime.utcnow()
+        lease_until = now + timedelta(seconds=lease)
+        heads = (
+            select(func.min(OutboxMessage.id))
+            .where(OutboxMessage.status.in_(ACTIVE_STATUSES))
+            .group_by(OutboxMessage.platform, OutboxMessage.recipient_id)
+        )
+        due = (
+            select(OutboxMessage.id)
+            .where(OutboxMessage.status == OutboxStatus.PENDING, OutboxMessage.next_attempt_at <= now)
+        )
+        if platform is not None:
+            heads = heads.where(OutboxMessage.platform == platform)
+            due = due.where(OutboxMessage.platform == platform)
+        due = due.where(OutboxMessage.id.in_(heads))
+        statement = (
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(due.order_by(OutboxMessage.id).limit(limit)), OutboxMessage.status == OutboxStatus.PENDING)
+            .values(status=OutboxStatus.SENDING, next_attempt_at=lease_until)
+            .execution_options(synchronize_session=False)
+        )
+        columns = (OutboxMessage.id, OutboxMessage.platform, OutboxMessage.recipient_id, OutboxMessage.message_text)
+        if db.get_bind().dialect.update_returning:
+            rows = list(db.execute(statement.returning(*columns)))
+        else:
+            db.execute(statement)
+            # Sin RETURNING: las filas reclamadas son las que tienen este vencimiento
+            rows = list(db.execute(
+                select(*columns).where(OutboxMessage.status == OutboxStatus.SENDING, OutboxMessage.next_attempt_at == lease_until)
+            ))
+        db.commit()
+        return sorted(rows, key=lambda row: row.id)
+
+    @staticmethod
+    def mark_results(db: Session, sent_ids: Iterable[int], failed_ids: Iterable[int], max_attempts: int, retry_delay: float) -> None:
+        """
+        Registra el resultado de un lote en una sola transacción.
+        Los fallidos vuelven a PENDING dentro de `retry_delay` segundos hasta
+        agotar `max_attempts`, y luego quedan en FAILED.
+        """
+        now = datetime.utcnow()
+        sent_ids, failed_ids = list(sent_ids), list(failed_ids)
+        if sent_ids:
+            db.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.id.in_(sent_ids))
+                .values(status=OutboxStatus.SENT, attempts=OutboxMessage.attempts + 1, sent_at=now)
+            )
+        if failed_ids:
+            db.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.id.in_(failed_ids))
+                .values(
+                    status=case(
+                        (OutboxMessage.attempts + 1 >= max_attempts, literal(OutboxStatus.FAILED, OutboxMessage.status.type)),
+                        else_=literal(OutboxStatus.PENDING, OutboxMessage.status.type)
+                    ),
+                    attempts=OutboxMessage.attempts + 1,
+                    next_attempt_at=now + timedelta(seconds=retry_delay)
+                )
+            )
+        db.commit()
+
+    @staticmethod
+    def release_expired(db: Session) -> int:
+        """
+        Devuelve a PENDING los envíos en SENDING cuyo reclamo venció (el
+        proceso que los reclamó se detuvo en medio del envío). Los reclamos
+        vigentes de otro proceso no se tocan. Entrega al menos una vez:
+        alguno pudo haber llegado antes de la caída.
+        """
+        now = datetime.utcnow()
+        released = db.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.status == OutboxStatus.SENDING, OutboxMessage.next_attempt_at <= now)
+            .values(status=OutboxStatus.PENDING, next_attempt_at=now)
+        ).rowcount
+        db.commit()
+        return released
+
+    @staticmethod
+    def release_held(db: Session) -> Tuple[int, int]:
+        """
+        Libera las respuestas retenidas en modo degradado. De las
+        reemplazables (COALESCIBLE_KINDS) solo se envía la última de cada
+        cliente; las demás quedan en COALESCED.
+
+        Returns:
+            (liberadas, descartadas por una más reciente)
+        """
+        coalescible = (OutboxMessage.status == OutboxStatus.HELD, OutboxMessage.kind.in_(COALESCIBLE_KINDS))
+        latest = (
+            select(func.max(OutboxMessage.id))
+            .where(*coalescible)
+            .group_by(OutboxMessage.platform, OutboxMessage.recipient_id)
+        )
+        coalesced = db.execute(
+            update(OutboxMessage)
+            .where(*coalescible, OutboxMessage.id.not_in(latest))
+            .values(status=OutboxStatus.COALESCED)
+        ).rowcount
+        released = db.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.status == OutboxStatus.HELD)
+            .values(status=OutboxStatus.PENDING, next_attempt_at=datetime.utcnow())
+        ).rowcount
+        if released:
+            db.info[PENDING_FLAG] = True
+        db.commit()
+        return released, coalesced
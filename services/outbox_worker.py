@@ -0,0 +1,203 @@
+"""
+Worker del outbox: envía los mensajes salientes guardados en la tabla outbox.
+Reclama por plataforma (un carril del despachador saliente cada una) lotes de
+hasta OUTBOX_BATCH_SIZE envíos vencidos, con a lo sumo
+OUTBOX_LANE_MAX_IN_FLIGHT en vuelo por carril, y los entrega a través del
+despachador (token bucket sobre el pool de conexiones de Meta). No espera al
+lote completo: cada resultado se anota al terminar su envío y los resultados
+acumulados se registran juntos en una sola transacción. Así una página de
+Instagram limitada por 429 solo ocupa su propio cupo y no frena las
+respuestas de WhatsApp ni los avisos al agente. De cada destinatario hay a lo
+sumo un envío en vuelo: el siguiente se reclama recién cuando el anterior
+quedó registrado, de modo que un reintento no deja pasar a la respuesta
+posterior y se conserva el orden por cliente de la cola de ingesta.
+
+Los commits del propio servidor que escriben en el outbox lo despiertan al
+instante (after_commit); si no, revisa cada OUTBOX_POLL_INTERVAL segundos, lo
+que también cubre los reintentos.
+
+Cada reclamo vence a los OUTBOX_CLAIM_LEASE segundos. Al arrancar, y luego
+cada ese intervalo, devuelve a pendientes los envíos con el reclamo vencido
+(quedaron a medias por una caída), de modo que se reanuda donde quedó
+(entrega al menos una vez) sin pisar los envíos en curso de otro proceso.
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import Row, event
+from database.database import SessionLocal, run_db
+from database.models import Platform
+from services.outbox_service import OutboxService, PENDING_FLAG
+from services.outbound_dispatcher import outbound_dispatcher
+from utils.logger import app_logger
+from config import settings
+
+
+class OutboxWorker:
+    def __init__(
+        self,
+        batch_size: int,
+        lane_max_in_flight: int,
+        poll_interval: float,
+        max_attempts: int,
+        retry_delay: float,
+        claim_lease: float
+    ):
+        self.batch_size = batch_size
+        self.lane_max_in_flight = lane_max_in_flight
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.claim_lease = claim_lease
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._in_flight: Dict[Platform, int] = {platform: 0 for platform in Platform}
+        self._results: List[Tuple[int, bool]] = []
+        self.counters = {"sent": 0, "failed": 0, "claims": 0, "flushes": 0, "released": 0}
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        await self._release_expired()
+        event.listen(SessionLocal, "after_commit", self._after_commit)
+        self._task = asyncio.create_task(self._run(), name="outbox-worker")
+        app_logger.info(f"Worker del outbox iniciado: batch={self.batch_size}, en vuelo por carril={self.lane_max_in_flight}")
+
+    async def stop(self, timeout: float):
+        """
+        Envía lo que ya está vencido (hasta `timeout` segundos) y se detiene.
+        Lo que quede pendiente o en vuelo se envía en el próximo arranque.
+        """
+        if self._task is None:
+            return
+        event.remove(SessionLocal, "after_commit", self._after_commit)
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout=timeout)
+        except asyncio.TimeoutError:
+            app_logger.warning("Outbox no drenado a tiempo; los envíos pendientes se reanudan al reiniciar")
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        app_logger.info("Worker del outbox detenido")
+
+    def _after_commit(self, session):
+        """Se ejecuta en el thread que hizo commit; despierta al worker."""
+        if session.info.pop(PENDING_FLAG, False) and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _release_expired(self):
+        released = await run_db(self._release_expired_sync)
+        self.counters["released"] += released
+        if released:
+            app_logger.warning(f"Outbox: {released} envío(s) interrumpido(s) vuelven a pendientes")
+
+    @staticmethod
+    def _release_expired_sync() -> int:
+        db = SessionLocal()
+        try:
+            return OutboxService.release_expired(db)
+        finally:
+            db.close()
+
+    def _claim(self, capacity: Dict[Platform, int]) -> List[Row]:
+        db = SessionLocal()
+        try:
+            rows = []
+            for platform, limit in capacity.items():
+                rows.extend(OutboxService.claim_batch(db, limit, self.claim_lease, platform))
+            return rows
+        finally:
+            db.close()
+
+    def _mark(self, sent_ids: List[int], failed_ids: List[int]):
+        db = SessionLocal()
+        try:
+            OutboxService.mark_results(db, sent_ids, failed_ids, self.max_attempts, self.retry_delay)
+        finally:
+            db.close()
+
+    def _capacity(self) -> Dict[Platform, int]:
+        """Cupo libre de cada carril, como mucho un lote."""
+        return {
+            platform: min(self.batch_size, self.lane_max_in_flight - in_flight)
+            for platform, in_flight in self._in_flight.items()
+            if in_flight < self.lane_max_in_flight
+        }
+
+    async def _run(self):
+        last_release = time.monotonic()
+        while True:
+            self._wakeup.clear()
+            claimed = 0
+            try:
+                if time.monotonic() - last_release > self.claim_lease:
+                    last_release = time.monotonic()
+                    await self._release_expired()
+                if self._results:
+                    await self._flush_results()
+                capacity = self._capacity()
+                if capacity:
+                    claimed = self._submit(await run_db(self._claim, capacity))
+            except Exception as e:
+                app_logger.error(f"Error en el worker del outbox: {e}")
+            if claimed:
+                continue
+            if self._stopping and not any(self._in_flight.values()) and not self._results:
+                return
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _submit(self, rows: List[Row]) -> int:
+        """Entrega cada fila al despachador sin esperar el resultado."""
+        for row in rows:
+            self._in_flight[row.platform] += 1
+            future = outbound_dispatcher.submit(row.platform, row.recipient_id, row.message_text)
+            future.add_done_callback(lambda f, row=row: self._on_result(row, f))
+        if rows:
+            self.counters["claims"] += 1
+        return len(rows)
+
+    def _on_result(self, row: Row, future: asyncio.Future):
+        self._in_flight[row.platform] -= 1
+        delivered = not future.cancelled() and future.exception() is None and future.result()
+        self._results.append((row.id, bool(delivered)))
+        self._wakeup.set()
+
+    async def _flush_results(self):
+        """Registra juntos todos los resultados acumulados."""
+        results, self._results = self._results, []
+        sent_ids = [row_id for row_id, delivered in results if delivered]
+        failed_ids = [row_id for row_id, delivered in results if not delivered]
+        try:
+            await run_db(self._mark, sent_ids, failed_ids)
+        except Exception:
+            # Se reintenta en la próxima vuelta; las filas siguen en SENDING
+            self._results = results + self._results
+            raise
+        self.counters["flushes"] += 1
+        self.counters["sent"] += len(sent_ids)
+        self.counters["failed"] += len(failed_ids)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "in_flight": {platform.value: count for platform, count in self._in_flight.items()},
+            "unflushed": len(self._results)
+        }
+
+
+outbox_worker = OutboxWorker(
+    batch_size=settings.outbox_batch_size,
+    lane_max_in_flight=settings.outbox_lane_max_in_flight,
+    poll_interval=settings.outbox_poll_interval,
+    max_attempts=settings.outbox_max_attempts,
+    retry_delay=settings.outbox_retry_delay,
+    claim_lease=settings.outbox_claim_lease
+)
@@ -0,0 +1,110 @@
+"""
+Adaptadores de plataforma: convierten el payload crudo de cada webhook de Meta
+en una lista de InboundEvent, el único tipo que ve la cola de ingesta.
+
+Instagram y Messenger comparten formato (entry -> messaging); WhatsApp usa
+entry -> changes -> value -> messages. La mayoría de los webhooks no traen
+texto (lecturas, entregas, reacciones, ecos de nuestros propios envíos): se
+descartan lo antes posible, sin crear objetos, y se cuentan por tipo.
+"""
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from database.models import Platform
+
+
+@dataclass(slots=True, frozen=True)
+class InboundEvent:
+    """Mensaje de texto entrante, normalizado para todas las plataformas."""
+    platform: Platform
+    sender: str
+    name: Optional[str]
+    text: str
+    message_id: Optional[str]
+    timestamp: Optional[float]  # epoch en segundos, según la plataforma
+
+
+# Eventos descartados por plataforma y tipo, para /metrics
+ignored_events: Counter = Counter()
+
+
+def _parse_messaging(platform: Platform, data: Dict[str, Any]) -> List[InboundEvent]:
+    """Instagram y Messenger: entry -> messaging."""
+    events = []
+    for entry in data.get("entry", ()):
+        for event in entry.get("messaging", ()):
+            message = event.get("message")
+            if message is None:
+                # read, delivery, reaction, postback...
+                kind = next((key for key in ("read", "delivery", "reaction", "postback") if key in event), "other")
+                ignored_events[f"{platform.value}:{kind}"] += 1
+                continue
+            if message.get("is_echo"):
+                ignored_events[f"{platform.value}:echo"] += 1
+                continue
+            text = message.get("text")
+            if not text:
+                ignored_events[f"{platform.value}:attachment"] += 1
+                continue
+            sender = event.get("sender", {}).get("id")
+            if not sender:
+                ignored_events[f"{platform.value}:no_sender"] += 1
+                continue
+            timestamp = event.get("timestamp")
+            events.append(InboundEvent(
+                platform=platform,
+                sender=sender,
+                name=None,  # Messenger e Instagram no envían el nombre en el webhook
+                text=text,
+                message_id=message.get("mid"),
+                timestamp=timestamp / 1000 if timestamp else None  # milisegundos
+            ))
+    return events
+
+
+def parse_instagram(data: Dict[str, Any]) -> List[InboundEvent]:
+    return _parse_messaging(Platform.INSTAGRAM, data)
+
+
+def parse_messenger(data: Dict[str, Any]) -> List[InboundEvent]:
+    return _parse_messaging(Platform.MESSENGER, data)
+
+
+def parse_whatsapp(data: Dict[str, Any]) -> List[InboundEvent]:
+    """WhatsApp: entry -> changes -> value -> messages (+ contacts con el nombre)."""
+    events = []
+    for entry in data.get("entry", ()):
+        for change in entry.get("changes", ()):
+            value = change.get("value", {})
+            messages = value.get("messages")
+            if not messages:
+                # Estados de envío (sent/delivered/read) y otros cambios
+                ignored_events["whatsapp:statuses" if "statuses" in value else "whatsapp:other"] += 1
+                continue
+            names = {
+                contact.get("wa_id"): contact.get("profile", {}).get("name")
+                for contact in value.get("contacts", ())
+            }
+            for message in messages:
+                if message.get("type", "text") != "text":
+                    ignored_events[f"whatsapp:{message.get('type')}"] += 1
+                    continue
+                text = message.get("text", {}).get("body")
+                if not text:
+                    ignored_events["whatsapp:empty"] += 1
+                    continue
+                sender = message.get("from")
+                if not sender:
+                    ignored_events["whatsapp:no_sender"] += 1
+                    continue
+                timestamp = message.get("timestamp")
+                events.append(InboundEvent(
+                    platform=Platform.WHATSAPP,
+                    sender=sender,
+                    # Si no coincide el wa_id se usa el primer contacto, como antes
+                    name=names.get(sender) or next(iter(names.values()), None),
+                    text=text,
+                    message_id=message.get("id"),
+                    timestamp=float(timestamp) if timestamp else None  # segundos, como string
+                ))
+    return events
@@ -0,0 +1,209 @@
+"""
+Exportación de reservas para reportes.
+Lee la tabla reservations por bloques (paginación por id) y la vuelca como
+CSV, NDJSON o Parquet sin cargarla entera en memoria: cada bloque se codifica
+y se descarta antes de leer el siguiente.
+
+Uso:
+    python -m services.reservation_export --format csv --start 2026-01-01 --end 2026-02-01 -o enero.csv
+"""
+import argparse
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database.database import SessionLocal, init_db
+from database.models import PendingReservation, Platform
+from utils.logger import app_logger
+
+EXPORT_FORMATS = ("csv", "ndjson", "parquet")
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Columnas exportadas, en orden
+EXPORT_COLUMNS = [
+    PendingReservation.id,
+    PendingReservation.platform,
+    PendingReservation.customer_id,
+    PendingReservation.customer_name,
+    PendingReservation.reservation_date,
+    PendingReservation.reservation_time,
+    PendingReservation.party_size,
+    PendingReservation.status,
+    PendingReservation.notes,
+    PendingReservation.created_at,
+    PendingReservation.updated_at,
+]
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+Row = Tuple
+
+
+def fetch_chunk(
+    db: Session,
+    chunk_size: int,
+    after_id: int = 0,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    platform: Optional[Platform] = None
+) -> List[Row]:
+    """
+    Siguiente bloque de reservas con id > after_id.
+
+    Los filtros de fecha aplican sobre created_at: start inclusivo, end exclusivo.
+    Se seleccionan columnas sueltas (no objetos ORM) para no llenar el
+    identity map de la sesión.
+    """
+    query = select(*EXPORT_COLUMNS).where(PendingReservation.id > after_id)
+    if start is not None:
+        query = query.where(PendingReservation.created_at >= start)
+    if end is not None:
+        query = query.where(PendingReservation.created_at < end)
+    if platform is not None:
+        query = query.where(PendingReservation.platform == platform)
+    rows = db.execute(query.order_by(PendingReservation.id).limit(chunk_size)).all()
+    db.rollback()  # cerrar la transacción de lectura entre bloques
+    return rows
+
+
+def iter_chunks(db: Session, chunk_size: int = 1000, **filters) -> Iterator[List[Row]]:
+    """Recorre todas las reservas que cumplen los filtros, bloque a bloque."""
+    after_id = 0
+    while True:
+        rows = fetch_chunk(db, chunk_size, after_id, **filters)
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1][0]
+
+
+def _plain(value):
+    """Valor exportable: enums por su valor y fechas en ISO 8601."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def csv_header() -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_FIELDS)
+    return buffer.getvalue().encode("utf-8")
+
+
+def encode_csv(rows: List[Row]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_plain(value) for value in row])
+    return buffer.getvalue().encode("utf-8")
+
+
+def encode_ndjson(rows: List[Row]) -> bytes:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_FIELDS, (_plain(value) for value in row))), ensure_ascii=False) + "\n"
+        for row in rows
+    ).encode("utf-8")
+
+
+def write_parquet(db: Session, output, chunk_size: int = 50000, **filters) -> int:
+    """
+    Escribe un archivo Parquet con un row group por bloque.
+    Requiere pyarrow (dependencia opcional, solo para este formato).
+
+    Returns:
+        Cantidad de filas exportadas
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError("El formato parquet requiere pyarrow (pip install pyarrow)") from exc
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("platform", pa.string()),
+        ("customer_id", pa.string()),
+        ("customer_name", pa.string()),
+        ("reservation_date", pa.timestamp("us")),
+        ("reservation_time", pa.string()),
+        ("party_size", pa.int32()),
+        ("status", pa.string()),
+        ("notes", pa.string()),
+        ("created_at", pa.timestamp("us")),
+        ("updated_at", pa.timestamp("us")),
+    ])
+    total = 0
+    with pq.ParquetWriter(output, schema) as writer:
+        for rows in iter_chunks(db, chunk_size, **filters):
+            columns = [list(column) for column in zip(*rows)]
+            for index in (1, 7):  # platform y status
+                columns[index] = [value.value for value in columns[index]]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            total += len(rows)
+    return total
+
+
+def export_reservations(db: Session, output, export_format: str = "csv", chunk_size: int = 1000, **filters) -> int:
+    """
+    Exporta las reservas a un archivo binario (o ruta, para parquet).
+
+    Returns:
+        Cantidad de filas exportadas
+    """
+    if export_format == "parquet":
+        return write_parquet(db, output, chunk_size, **filters)
+
+    encode = encode_csv if export_format == "csv" else encode_ndjson
+    if export_format == "csv":
+        output.write(csv_header())
+    total = 0
+    for rows in iter_chunks(db, chunk_size, **filters):
+        output.write(encode(rows))
+        total += len(rows)
+    return total
+
+
+def _parse_date(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--start", type=_parse_date, help="created_at desde (inclusivo), ISO 8601")
+    parser.add_argument("--end", type=_parse_date, help="created_at hasta (exclusivo), ISO 8601")
+    parser.add_argument("--platform", choices=[platform.value for platform in Platform])
+    parser.add_argument("--chunk-size", type=int, default=None, help="filas por bloque (parquet: por row group)")
+    # Obligatorio: el logger escribe en stdout
+    parser.add_argument("-o", "--output", required=True, help="archivo de salida")
+    args = parser.parse_args()
+
+    chunk_size = args.chunk_size or (50000 if args.format == "parquet" else 1000)
+    filters = {
+        "start": args.start,
+        "end": args.end,
+        "platform": Platform(args.platform) if args.platform else None,
+    }
+
+    init_db()
+    db = SessionLocal()
+    try:
+        if args.format == "parquet":
+            total = export_reservations(db, args.output, args.format, chunk_size, **filters)
+        else:
+            with open(args.output, "wb") as output:
+                total = export_reservations(db, output, args.format, chunk_size, **filters)
+        app_logger.info(f"Exportación de reservas terminada: {total} filas ({args.format})")
+    finally:
+        db.close()
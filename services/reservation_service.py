@@ -2,11 +2,37 @@
 Servicio de gestión de reservas.
 Maneja la lógica de negocio para crear, actualizar y consultar reservas.
 """
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence
+from sqlalchemy import and_, or_, select, update
 from sqlalchemy.orm import Session
 from database.models import PendingReservation, ReservationStatus, Platform
 from utils.logger import app_logger
+from services.feed_service import (
+    FeedService, RESERVATION_CREATED, RESERVATION_STATUS_CHANGED, RESERVATIONS_STATUS_CHANGED
+)
+
+# Resultados por id de bulk_update_status
+BULK_UPDATED = "updated"
+BULK_NOT_FOUND = "not_found"
+BULK_INVALID_STATUS = "invalid_status"  # la reserva ya no estaba en el estado esperado
+
+
+@dataclass
+class ReservationPage:
+    """Página de un listado paginado por cursor."""
+    items: List[PendingReservation]  # filas (tuplas) si se pidieron columnas
+    next_cursor: Optional[str]  # None si no hay más páginas
+
+
+def _encode_cursor(sort_value: datetime, reservation_id: int) -> str:
+    return f"{sort_value.isoformat()}|{reservation_id}"
+
+
+def _decode_cursor(cursor: str):
+    sort_value, reservation_id = cursor.rsplit("|", 1)
+    return datetime.fromisoformat(sort_value), int(reservation_id)
 
 
 class ReservationService:
@@ -23,10 +49,14 @@ class ReservationService:
         reservation_date: Optional[datetime] = None,
         reservation_time: Optional[str] = None,
         party_size: Optional[int] = None,
-        notes: Optional[str] = None
+        notes: Optional[str] = None,
+        commit: bool = True
     ) -> PendingReservation:
         """
         Crea una nueva reserva en estado PENDING.
+        
+        Con commit=False solo hace flush (asigna el ID sin releer la fila) y
+        el llamador confirma la transacción.
         """
         reservation = PendingReservation(
             platform=platform,
@@ -40,8 +70,11 @@ class ReservationService:
         )
         
         db.add(reservation)
-        db.commit()
-        db.refresh(reservation)
+        db.flush()
+        FeedService.record(db, RESERVATION_CREATED, FeedService.reservation_data(reservation))
+        if commit:
+            db.commit()
+            db.refresh(reservation)
         
         app_logger.info(
             f"Reserva creada: ID={reservation.id}, "
@@ -70,6 +103,10 @@ class ReservationService:
         old_status = reservation.status
         reservation.status = new_status
         reservation.updated_at = datetime.utcnow()
+        FeedService.record(db, RESERVATION_STATUS_CHANGED, {
+            **FeedService.reservation_data(reservation),
+            "old_status": old_status.value
+        })
         
         db.commit()
         db.refresh(reservation)
@@ -81,6 +118,70 @@ class ReservationService:
         
         return reservation
     
+    @staticmethod
+    def bulk_update_status(
+        db: Session,
+        reservation_ids: Iterable[int],
+        new_status: ReservationStatus,
+        expected_status: ReservationStatus = ReservationStatus.PENDING
+    ) -> Dict[int, str]:
+        """
+        Cambia el estado de varias reservas con un único UPDATE ... WHERE id IN
+        (...) AND status = expected_status, en una sola transacción y con un
+        solo evento para el feed.
+        
+        La condición sobre el estado hace la transición segura ante otro
+        agente que acepta o rechaza la misma reserva al mismo tiempo: solo una
+        de las dos actualizaciones la encuentra pendiente.
+        
+        Returns:
+            {id: BULK_UPDATED | BULK_NOT_FOUND | BULK_INVALID_STATUS}
+        """
+        ids = list(dict.fromkeys(int(reservation_id) for reservation_id in reservation_ids))
+        if not ids:
+            return {}
+        
+        now = datetime.utcnow()
+        statement = (
+            update(PendingReservation)
+            .where(PendingReservation.id.in_(ids), PendingReservation.status == expected_status)
+            .values(status=new_status, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if db.get_bind().dialect.update_returning:
+            updated = set(db.scalars(statement.returning(PendingReservation.id)))
+        else:
+            db.execute(statement)
+            # Sin RETURNING: las filas tocadas son las que tienen este updated_at
+            updated = set(db.scalars(
+                select(PendingReservation.id).where(
+                    PendingReservation.id.in_(ids),
+                    PendingReservation.status == new_status,
+                    PendingReservation.updated_at == now
+                )
+            ))
+        
+        results = {reservation_id: BULK_NOT_FOUND for reservation_id in ids}
+        results.update({reservation_id: BULK_UPDATED for reservation_id in updated})
+        remaining = [reservation_id for reservation_id in ids if reservation_id not in updated]
+        if remaining:
+            existing = db.scalars(select(PendingReservation.id).where(PendingReservation.id.in_(remaining)))
+            results.update({reservation_id: BULK_INVALID_STATUS for reservation_id in existing})
+        
+        if updated:
+            FeedService.record(db, RESERVATIONS_STATUS_CHANGED, {
+                "ids": sorted(updated),
+                "status": new_status.value,
+                "old_status": expected_status.value
+            })
+        db.commit()
+        
+        app_logger.info(
+            f"Reservas actualizadas en bloque: {len(updated)}/{len(ids)}, "
+            f"{expected_status} -> {new_status}"
+        )
+        return results
+    
     @staticmethod
     def get_pending_reservations(db: Session) -> List[PendingReservation]:
         return db.query(PendingReservation).filter(
@@ -98,3 +199,79 @@ class ReservationService:
         return db.query(PendingReservation).order_by(
             PendingReservation.created_at.desc()
         ).all()
+    
+    @staticmethod
+    def _get_page(
+        db: Session,
+        status: Optional[ReservationStatus],
+        sort_column,
+        limit: int,
+        cursor: Optional[str],
+        columns: Optional[Sequence] = None
+    ) -> ReservationPage:
+        """
+        Paginación por cursor (keyset) en orden descendente de (sort_column, id).
+        Usa los índices (status, created_at) / (status, updated_at): cada página
+        cuesta lo mismo sin importar cuántas filas haya antes.
+        
+        Con columns se devuelven filas (tuplas) con esas columnas en lugar de
+        objetos ORM; id y sort_column se agregan al final si faltan.
+        """
+        if columns is None:
+            query = db.query(PendingReservation)
+        else:
+            keys = {column.key for column in columns}
+            extra = [column for column in (PendingReservation.id, sort_column) if column.key not in keys]
+            query = db.query(*columns, *extra)
+        if status is not None:
+            query = query.filter(PendingReservation.status == status)
+        if cursor:
+            last_value, last_id = _decode_cursor(cursor)
+            query = query.filter(or_(
+                sort_column < last_value,
+                and_(sort_column == last_value, PendingReservation.id < last_id)
+            ))
+        rows = query.order_by(sort_column.desc(), PendingReservation.id.desc()).limit(limit + 1).all()
+        
+        items = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = _encode_cursor(getattr(last, sort_column.key), last.id)
+        return ReservationPage(items=items, next_cursor=next_cursor)
+    
+    @staticmethod
+    def get_pending_page(
+        db: Session,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence] = None
+    ) -> ReservationPage:
+        """Reservas pendientes, más recientes primero, de a `limit`."""
+        return ReservationService._get_page(
+            db, ReservationStatus.PENDING, PendingReservation.created_at, limit, cursor, columns
+        )
+    
+    @staticmethod
+    def get_confirmed_page(
+        db: Session,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence] = None
+    ) -> ReservationPage:
+        """Reservas confirmadas, última confirmación primero, de a `limit`."""
+        return ReservationService._get_page(
+            db, ReservationStatus.CONFIRMED, PendingReservation.updated_at, limit, cursor, columns
+        )
+    
+    @staticmethod
+    def get_all_page(
+        db: Session,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence] = None
+    ) -> ReservationPage:
+        """Todas las reservas (historial), más recientes primero, de a `limit`."""
+        return ReservationService._get_page(
+            db, None, PendingReservation.created_at, limit, cursor, columns
+        )
@@ -0,0 +1,41 @@
+"""
+Configuración común de las pruebas: variables de entorno mínimas y una base
+SQLite temporal, antes de importar config y database.
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+_tmpdir = tempfile.mkdtemp(prefix="reservas-tests-")
+
+for name in (
+    "META_APP_ID", "META_APP_SECRET", "META_VERIFY_TOKEN",
+    "INSTAGRAM_PAGE_ACCESS_TOKEN", "MESSENGER_PAGE_ACCESS_TOKEN",
+    "WHATSAPP_BUSINESS_ACCOUNT_ID", "WHATSAPP_PHONE_NUMBER_ID", "WHATSAPP_ACCESS_TOKEN",
+):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("AGENT_WHATSAPP_NUMBER", "5490000000000")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'test.db')}"
+os.environ["HISTORY_WRITE_MODE"] = "sync"
+os.environ["DEBUG"] = "false"
+os.environ["LOG_LEVEL"] = "WARNING"
+os.environ["LOG_FILE"] = os.path.join(_tmpdir, "app.log")
+# Sin base de conocimientos, como en una instalación nueva
+os.environ["KNOWLEDGE_BASE_PATH"] = os.path.join(_tmpdir, "restaurant_info.json")
+
+import pytest
+from database import Base, engine, init_db, SessionLocal
+
+
+@pytest.fixture
+def db():
+    """Base de datos vacía y una sesión por prueba."""
+    Base.metadata.drop_all(bind=engine)
+    init_db()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,46 @@
+"""
+Pruebas de la clave de los endpoints internos.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from config import settings
+from routers import events, reservations, reservations_export
+from services.event_feed import event_feed
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    monkeypatch.setattr(settings, "admin_api_key", "secreta")
+    app = FastAPI()
+    app.include_router(reservations_export.router)
+    app.include_router(events.router)
+    app.include_router(reservations.router)
+    return TestClient(app)
+
+
+def test_export_requires_admin_key(client):
+    assert client.get("/export/reservations").status_code == 401
+    assert client.get("/export/reservations", headers={"X-Admin-Key": "otra"}).status_code == 401
+    assert client.get("/export/reservations", headers={"X-Admin-Key": "secreta"}).status_code == 200
+
+
+def test_export_disabled_without_configured_key(client, monkeypatch):
+    monkeypatch.setattr(settings, "admin_api_key", "")
+    assert client.get("/export/reservations", headers={"X-Admin-Key": ""}).status_code == 503
+
+
+def test_bulk_status_requires_admin_key(client):
+    body = {"ids": [1], "status": "confirmed"}
+    assert client.post("/reservations/status", json=body).status_code == 401
+    response = client.post("/reservations/status", json=body, headers={"X-Admin-Key": "secreta"})
+    assert response.status_code == 200
+    assert response.json()["updated"] == 0
+
+
+def test_event_stream_requires_admin_key_and_caps_subscribers(client, monkeypatch):
+    assert client.get("/events/stream").status_code == 401
+
+    monkeypatch.setattr(event_feed, "max_subscribers", 1)
+    monkeypatch.setattr(event_feed, "_subscribers", {object()})
+    assert client.get("/events/stream", headers={"X-Admin-Key": "secreta"}).status_code == 503
@@ -0,0 +1,53 @@
+"""
+Pruebas del feed en vivo cuando la poda vacía la tabla de eventos.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import delete, update
+from database.models import FeedEvent
+from services.event_feed import EventFeed, FEED_RESET
+from services.feed_service import FeedService
+
+
+def _record(db, count):
+    for i in range(count):
+        FeedService.record(db, "test", {"n": i})
+    db.commit()
+
+
+def test_prune_keeps_latest_event_and_ids_keep_growing(db):
+    _record(db, 5)
+    db.execute(update(FeedEvent).values(created_at=datetime.utcnow() - timedelta(hours=48)))
+    db.commit()
+
+    assert FeedService.prune(db, retention_hours=24) == 4
+    _record(db, 2)
+    assert [event.id for event in FeedService.get_events_after(db, 0, 10)] == [5, 6, 7]
+
+
+def test_tail_recovers_when_ids_start_over(db):
+    _record(db, 5)
+
+    async def scenario():
+        feed = EventFeed(poll_interval=0.01, buffer_size=100, subscriber_queue=100, retention_hours=24)
+        await feed.start()
+        try:
+            queue, _ = await feed.subscribe()
+            # Tabla vaciada e ids reutilizados, como en una tabla sin AUTOINCREMENT
+            db.execute(delete(FeedEvent))
+            db.add_all([FeedEvent(id=i, event_type="test", payload="{}") for i in (1, 2)])
+            db.commit()
+            for _ in range(100):
+                if feed.stats()["last_id"] == 2:
+                    break
+                await asyncio.sleep(0.01)
+            closed = queue.get_nowait()
+            _, missed = await feed.subscribe(last_event_id=5)
+            return feed.stats()["last_id"], closed, missed
+        finally:
+            await feed.stop()
+
+    last_id, closed, missed = asyncio.run(scenario())
+    assert last_id == 2
+    assert closed is None  # los suscriptores se desconectan para que recarguen
+    assert [(message.id, message.event_type) for message in missed] == [(2, FEED_RESET)]
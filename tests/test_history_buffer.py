@@ -0,0 +1,39 @@
+"""
+Pruebas del buffer write-behind del historial.
+"""
+import asyncio
+from database.models import MessagesHistory, Platform
+from services.history_buffer import HistoryWriteBuffer
+
+
+def test_invalid_row_is_dropped_without_blocking_the_rest(db):
+    buffer = HistoryWriteBuffer(mode="buffered", max_rows=100, interval=60, max_pending=100)
+
+    async def scenario():
+        await buffer.start()
+        buffer.add(Platform.WHATSAPP, "c1", "hola", message_id="m1")
+        buffer.add(Platform.WHATSAPP, "c2", None, message_id="m2")  # message_text NOT NULL
+        buffer.add(Platform.WHATSAPP, "c3", "chau", message_id="m3")
+        await buffer.flush()
+        await buffer.stop()
+
+    asyncio.run(scenario())
+    assert sorted(row.message_id for row in db.query(MessagesHistory)) == ["m1", "m3"]
+    stats = buffer.stats()
+    assert (stats["pending"], stats["dropped_rows"], stats["flushed_rows"]) == (0, 1, 2)
+    assert not buffer.contains("m2")
+
+
+def test_buffer_over_max_pending_falls_back_to_sync(db):
+    buffer = HistoryWriteBuffer(mode="buffered", max_rows=100, interval=60, max_pending=2)
+
+    async def scenario():
+        await buffer.start()
+        states = [buffer.enabled]
+        buffer.add(Platform.WHATSAPP, "c1", "hola", message_id="m1")
+        buffer.add(Platform.WHATSAPP, "c1", "hola", message_id="m2")
+        states.append(buffer.enabled)
+        await buffer.stop()
+        return states
+
+    assert asyncio.run(scenario()) == [True, False]
@@ -0,0 +1,64 @@
+"""
+Pruebas de la cola de ingesta con el procesador simulado.
+"""
+import asyncio
+from database import SessionLocal
+from database.models import OutboxMessage, OutboxStatus, Platform
+from services import ingest_queue as module
+from services.ingest_queue import IngestQueue
+from services.outbox_service import OutboxService
+from services.platform_adapters import InboundEvent
+
+
+def _event(sender, text):
+    return InboundEvent(Platform.WHATSAPP, sender, None, text, None, None)
+
+
+class SlowProcessor:
+    """Guarda la respuesta en el outbox como el procesador real; los mensajes de "slow" tardan más."""
+
+    async def process_message(self, db, platform, customer_id, customer_name, message_text, message_id, hold_reply=False):
+        await asyncio.sleep(0.2 if customer_id == "slow" else 0.01)
+        response = f"re:{message_text}"
+        with SessionLocal() as session:
+            OutboxService.add(session, platform, customer_id, response, kind="knowledge_response", held=hold_reply)
+            session.commit()
+        return {"type": "knowledge_response", "response_message": response}
+
+
+def _outbox(db):
+    db.expire_all()
+    return {row.recipient_id: row.status for row in db.query(OutboxMessage)}
+
+
+def test_reply_held_after_leaving_degraded_mode_is_released(db, monkeypatch):
+    monkeypatch.setattr(module, "message_processor", SlowProcessor())
+
+    async def scenario():
+        queue = IngestQueue(workers=2, maxsize=100, degraded_threshold=2)
+        await queue.start()
+        queue.enqueue_batch([_event("slow", "0")] + [_event(f"c{i}", str(i)) for i in range(4)])
+        # Todos procesados, sin pasar por stop() (que también libera las retenidas)
+        await asyncio.wait_for(queue._ready.join(), timeout=5)
+        degraded = queue._degraded
+        outbox = _outbox(db)
+        await queue.stop(timeout=1)
+        return degraded, outbox
+
+    degraded, outbox = asyncio.run(scenario())
+    assert not degraded
+    assert outbox["slow"] == OutboxStatus.PENDING
+    assert OutboxStatus.HELD not in outbox.values()
+
+
+def test_held_replies_survive_restart(db):
+    OutboxService.add(db, Platform.WHATSAPP, "c1", "hola", kind="knowledge_response", held=True)
+    db.commit()
+
+    async def restart():
+        queue = IngestQueue(workers=1, maxsize=10, degraded_threshold=2)
+        await queue.start()
+        await queue.stop(timeout=1)
+
+    asyncio.run(restart())
+    assert _outbox(db) == {"c1": OutboxStatus.PENDING}
@@ -0,0 +1,8 @@
+"""
+Pruebas del detector de intenciones con frases reales de clientes.
+"""
+from benchmarks.intent_matcher import check_phrasings
+
+
+def test_real_phrasings_match_expected_intents():
+    assert check_phrasings() == []
@@ -0,0 +1,44 @@
+"""
+Pruebas de la recarga en caliente de la base de conocimientos.
+"""
+import asyncio
+import json
+import os
+from services import knowledge_base as module
+from services.knowledge_base import KnowledgeBase
+
+
+def _write(path, greeting, mtime):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"restaurant": {"message_examples": {"greeting": greeting}}}, f)
+    os.utime(path, (mtime, mtime))
+
+
+def test_snapshot_does_no_io_and_watcher_reloads(tmp_path, monkeypatch):
+    path = str(tmp_path / "restaurant_info.json")
+    _write(path, "Hola", 1_000)
+    kb = KnowledgeBase(path, check_interval=0.01)
+    assert kb.snapshot.replies["greeting"] == "Hola"
+
+    _write(path, "Buenas", 2_000)
+
+    def no_stat(*args, **kwargs):
+        raise AssertionError("snapshot no debe tocar el disco")
+
+    # Leer el snapshot no toca el archivo aunque haya vencido el intervalo
+    with monkeypatch.context() as patch:
+        patch.setattr(module.os, "stat", no_stat)
+        assert kb.snapshot.replies["greeting"] == "Hola"
+
+    async def watch():
+        await kb.start()
+        try:
+            for _ in range(100):
+                if kb.snapshot.replies["greeting"] == "Buenas":
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await kb.stop()
+
+    asyncio.run(watch())
+    assert kb.snapshot.replies["greeting"] == "Buenas"
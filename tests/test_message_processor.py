@@ -0,0 +1,80 @@
+"""
+Pruebas del procesador de mensajes sin base de conocimientos (instalación
+nueva): las respuestas no configuradas no deben romper la unidad de trabajo.
+"""
+import asyncio
+import uuid
+import pytest
+from sqlalchemy.exc import IntegrityError
+from database.models import (
+    MessagesHistory, Notification, OutboxMessage, OutboxStatus, PendingReservation, Platform
+)
+from services.message_processor import message_processor
+from config import settings
+
+
+def _process(db, text):
+    return asyncio.run(message_processor.process_message(
+        db=db,
+        platform=Platform.WHATSAPP,
+        customer_id="5491155550000",
+        customer_name="Cliente",
+        message_text=text,
+        message_id=f"wamid.{uuid.uuid4().hex}"
+    ))
+
+
+def test_reservation_without_knowledge_base(db):
+    result = _process(db, "Quiero reservar una mesa para 4 personas mañana a las 21:00")
+
+    assert result["type"] == "reservation_request"
+    assert result["response_message"] is None
+    assert db.query(MessagesHistory).count() == 1
+    assert db.query(PendingReservation).count() == 1
+    assert db.query(Notification).count() == 1
+    assert db.query(OutboxMessage).count() == 0
+
+
+def test_agent_request_without_knowledge_base_still_alerts(db):
+    result = _process(db, "Quiero hablar con un agente")
+
+    assert result["type"] == "agent_request"
+    outbox = db.query(OutboxMessage).all()
+    assert [message.recipient_id for message in outbox] == [settings.agent_whatsapp_number]
+
+
+def test_constraint_error_is_not_reported_as_duplicate(db, monkeypatch):
+    from services import message_processor as module
+
+    message_id = f"wamid.{uuid.uuid4().hex}"
+
+    def process():
+        return asyncio.run(message_processor.process_message(
+            db=db, platform=Platform.WHATSAPP, customer_id="5491155550000",
+            customer_name="Cliente", message_text="hola", message_id=message_id
+        ))
+
+    # Fila inválida en la misma transacción (message_text NOT NULL)
+    monkeypatch.setattr(module.OutboxService, "add", lambda db, *args, **kwargs: db.add(OutboxMessage(
+        platform=Platform.WHATSAPP, recipient_id="x", message_text=None
+    )))
+    with pytest.raises(IntegrityError):
+        process()
+    assert db.query(MessagesHistory).count() == 0
+
+    # La clave de deduplicación se liberó: la reentrega se procesa
+    monkeypatch.undo()
+    assert process()["type"] == "knowledge_response"
+    assert db.query(MessagesHistory).count() == 1
+
+
+def test_held_reply_is_stored_with_the_message(db):
+    result = asyncio.run(message_processor.process_message(
+        db=db, platform=Platform.WHATSAPP, customer_id="5491155550000",
+        customer_name="Cliente", message_text="hola",
+        message_id=f"wamid.{uuid.uuid4().hex}", hold_reply=True
+    ))
+
+    assert result["type"] == "knowledge_response"
+    outbox = db.query(OutboxMessage).one()
+    assert (outbox.kind, outbox.status) == ("knowledge_response", OutboxStatus.HELD)
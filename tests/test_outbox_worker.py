@@ -0,0 +1,106 @@
+"""
+Pruebas del worker del outbox con el envío a Meta simulado.
+"""
+import asyncio
+from datetime import datetime
+import httpx
+from sqlalchemy import update
+from database.models import OutboxMessage, OutboxStatus, Platform
+from services.meta_api_client import meta_api_client
+from services.outbound_dispatcher import outbound_dispatcher
+from services.outbox_service import OutboxService
+from services.outbox_worker import OutboxWorker
+
+
+def _statuses(db):
+    db.expire_all()
+    return {(row.platform, row.recipient_id): row.status for row in db.query(OutboxMessage)}
+
+
+def test_throttled_lane_does_not_block_other_platforms(db, monkeypatch):
+    instagram_blocked = asyncio.Event()
+
+    async def fake_send(platform, recipient_id, message_text):
+        if platform == Platform.INSTAGRAM:
+            await instagram_blocked.wait()
+        return httpx.Response(200, request=httpx.Request("POST", "https://graph.facebook.com"))
+
+    monkeypatch.setattr(meta_api_client, "send_message", fake_send)
+    OutboxService.add(db, Platform.INSTAGRAM, "ig-1", "hola")
+    OutboxService.add(db, Platform.WHATSAPP, "wa-1", "hola")
+    db.commit()
+
+    async def scenario():
+        worker = OutboxWorker(batch_size=10, lane_max_in_flight=10, poll_interval=0.05, max_attempts=3, retry_delay=0, claim_lease=60)
+        await outbound_dispatcher.start()
+        await worker.start()
+        try:
+            for _ in range(100):
+                if _statuses(db)[(Platform.WHATSAPP, "wa-1")] == OutboxStatus.SENT:
+                    break
+                await asyncio.sleep(0.02)
+            during = _statuses(db)
+            instagram_blocked.set()
+            await worker.stop(timeout=5)
+            return during
+        finally:
+            await outbound_dispatcher.stop(timeout=1)
+
+    during = asyncio.run(scenario())
+    assert during[(Platform.WHATSAPP, "wa-1")] == OutboxStatus.SENT
+    assert during[(Platform.INSTAGRAM, "ig-1")] == OutboxStatus.SENDING
+    assert _statuses(db)[(Platform.INSTAGRAM, "ig-1")] == OutboxStatus.SENT
+
+
+def test_release_held_keeps_reservation_replies_and_latest_general_reply(db):
+    OutboxService.add(db, Platform.WHATSAPP, "c1", "reserva recibida", kind="reservation_request", held=True)
+    OutboxService.add(db, Platform.WHATSAPP, "c1", "horarios", kind="knowledge_response", held=True)
+    OutboxService.add(db, Platform.WHATSAPP, "c1", "ubicación", kind="knowledge_response", held=True)
+    OutboxService.add(db, Platform.WHATSAPP, "c2", "hola", kind="knowledge_response", held=True)
+    db.commit()
+
+    assert OutboxService.release_held(db) == (3, 1)
+    statuses = {row.message_text: row.status for row in db.query(OutboxMessage)}
+    assert statuses == {
+        "reserva recibida": OutboxStatus.PENDING,
+        "horarios": OutboxStatus.COALESCED,
+        "ubicación": OutboxStatus.PENDING,
+        "hola": OutboxStatus.PENDING,
+    }
+
+
+def test_claim_is_exclusive_and_live_claims_survive_release(db):
+    for i in range(3):
+        OutboxService.add(db, Platform.WHATSAPP, f"wa-{i}", "hola")
+    db.commit()
+
+    first = OutboxService.claim_batch(db, limit=2, lease=300)
+    second = OutboxService.claim_batch(db, limit=10, lease=300)
+    assert [row.recipient_id for row in first] == ["wa-0", "wa-1"]
+    assert [row.recipient_id for row in second] == ["wa-2"]
+    assert OutboxService.claim_batch(db, limit=10, lease=300) == []
+
+    # Otro proceso arranca: los reclamos vigentes siguen siendo de su dueño
+    assert OutboxService.release_expired(db) == 0
+    db.execute(update(OutboxMessage).where(OutboxMessage.recipient_id == "wa-0").values(next_attempt_at=datetime.utcnow()))
+    db.commit()
+    assert OutboxService.release_expired(db) == 1
+    assert _statuses(db)[(Platform.WHATSAPP, "wa-0")] == OutboxStatus.PENDING
+
+
+def test_one_message_in_flight_per_recipient_in_order(db):
+    OutboxService.add(db, Platform.WHATSAPP, "c1", "primera")
+    OutboxService.add(db, Platform.WHATSAPP, "c1", "segunda")
+    OutboxService.add(db, Platform.WHATSAPP, "c2", "otra")
+    db.commit()
+
+    claimed = OutboxService.claim_batch(db, limit=10, lease=300)
+    assert [row.message_text for row in claimed] == ["primera", "otra"]
+    assert OutboxService.claim_batch(db, limit=10, lease=300) == []
+
+    # La primera falla y se reintenta más tarde: la segunda sigue esperando
+    first = claimed[0].id
+    OutboxService.mark_results(db, [], [first], max_attempts=3, retry_delay=0)
+    assert [row.message_text for row in OutboxService.claim_batch(db, limit=10, lease=300)] == ["primera"]
+    OutboxService.mark_results(db, [first], [], max_attempts=3, retry_delay=0)
+    assert [row.message_text for row in OutboxService.claim_batch(db, limit=10, lease=300)] == ["segunda"]
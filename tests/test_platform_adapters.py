@@ -0,0 +1,20 @@
+"""
+Pruebas de los adaptadores de webhooks.
+"""
+from services.platform_adapters import ignored_events, parse_messenger, parse_whatsapp
+
+
+def test_events_without_sender_are_ignored():
+    before = ignored_events.copy()
+    messenger = {"entry": [{"messaging": [
+        {"message": {"mid": "m1", "text": "hola"}},
+        {"sender": {"id": "9"}, "message": {"mid": "m2", "text": "hola"}},
+    ]}]}
+    whatsapp = {"entry": [{"changes": [{"value": {"messages": [
+        {"id": "w1", "type": "text", "text": {"body": "hola"}},
+    ]}}]}]}
+
+    assert [event.sender for event in parse_messenger(messenger)] == ["9"]
+    assert parse_whatsapp(whatsapp) == []
+    assert ignored_events["messenger:no_sender"] - before["messenger:no_sender"] == 1
+    assert ignored_events["whatsapp:no_sender"] - before["whatsapp:no_sender"] == 1
@@ -0,0 +1,87 @@
+"""
+Capa de datos del dashboard Streamlit.
+Los listados se leen por columnas directo a pandas con sesiones cortas del
+pool y se guardan en st.cache_data, compartido entre sesiones: un clic ya no
+vuelve a consultar la base de datos salvo que los datos hayan cambiado.
+
+La caché se invalida por TTL, al aceptar/rechazar desde el dashboard y,
+con el feed en vivo conectado, con cada evento (el último id del feed forma
+parte de la clave).
+"""
+from typing import Iterable, List, Optional, Tuple
+import pandas as pd
+import streamlit as st
+from database import SessionLocal, init_db
+from database.models import PendingReservation, ReservationStatus
+from services.reservation_service import ReservationService, BULK_UPDATED
+from config import settings
+
+# Columnas de los listados, en el orden de las columnas del DataFrame
+LIST_COLUMNS = [
+    PendingReservation.id,
+    PendingReservation.platform,
+    PendingReservation.customer_id,
+    PendingReservation.customer_name,
+    PendingReservation.reservation_date,
+    PendingReservation.reservation_time,
+    PendingReservation.party_size,
+    PendingReservation.status,
+    PendingReservation.created_at,
+    PendingReservation.updated_at,
+]
+LIST_FIELDS = [column.key for column in LIST_COLUMNS]
+ENUM_FIELDS = ("platform", "status")
+
+PAGE_FETCHERS = {
+    "pending": ReservationService.get_pending_page,
+    "confirmed": ReservationService.get_confirmed_page,
+    "history": ReservationService.get_all_page,
+}
+
+
+@st.cache_resource
+def ensure_db():
+    """init_db una sola vez por proceso, no por sesión."""
+    init_db()
+    return True
+
+
+def _to_frame(rows: List[tuple]) -> pd.DataFrame:
+    """Filas de la consulta a DataFrame, columna por columna."""
+    columns = list(zip(*rows)) if rows else [()] * len(LIST_FIELDS)
+    data = {}
+    for field, values in zip(LIST_FIELDS, columns):
+        if field in ENUM_FIELDS:
+            values = [value.value for value in values]
+        data[field] = values
+    return pd.DataFrame(data, columns=LIST_FIELDS)
+
+
+@st.cache_data(ttl=settings.dashboard_cache_ttl, show_spinner=False)
+def load_page(kind: str, limit: int, cursor: Optional[str], feed_version: Optional[int]) -> Tuple[pd.DataFrame, Optional[str]]:
+    """
+    Una página del listado como DataFrame, más el cursor de la siguiente.
+    feed_version solo forma parte de la clave de la caché.
+    """
+    with SessionLocal() as db:
+        page = PAGE_FETCHERS[kind](db, limit, cursor, columns=LIST_COLUMNS)
+    return _to_frame(page.items), page.next_cursor
+
+
+def invalidate():
+    """Descartar los listados cacheados (tras un cambio hecho desde el dashboard)."""
+    load_page.clear()
+
+
+def set_status(reservation_ids: Iterable[int], new_status: ReservationStatus) -> int:
+    """
+    Cambia el estado de varias reservas pendientes en una sola transacción
+    (y un único rerun).
+
+    Returns:
+        Cantidad de reservas actualizadas (las que otro agente ya resolvió no cuentan)
+    """
+    with SessionLocal() as db:
+        results = ReservationService.bulk_update_status(db, reservation_ids, new_status)
+    invalidate()
+    return sum(1 for outcome in results.values() if outcome == BULK_UPDATED)
@@ -4,16 +4,35 @@ Interfaz con Tkinter para gestión de reservas.
 """
 import tkinter as tk
 from tkinter import ttk, messagebox
+import queue
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 # Agregar el directorio raíz al path para imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from database import SessionLocal, init_db
 from database.models import ReservationStatus
-from services.reservation_service import ReservationService
+from services.reservation_service import ReservationService, BULK_UPDATED
 from services.notification_service import NotificationService
+from services.feed_service import NOTIFICATION_CREATED, NOTIFICATIONS_READ
+from utils.feed_client import FeedSubscriber
+from config import settings
+
+# Filas por página en los listados (paginación por cursor)
+PAGE_SIZE = 50
+
+# Cada cuánto se aplican los eventos del feed recibidos (sin tocar la BD)
+FEED_CHECK_MS = 250
+# Consulta a la BD cuando el servidor no está disponible
+FALLBACK_POLL_MS = 5000
+# Cada cuánto se aplican en Tk los resultados de las consultas en segundo plano
+UI_RESULTS_MS = 50
+# Fracción del scroll a partir de la cual se pide la página siguiente
+LOAD_MORE_AT = 0.95
+
+PANELS = ("pending", "confirmed", "history")
 
 
 class MainWindow:
@@ -30,6 +49,30 @@ class MainWindow:
         init_db()
         self.db = SessionLocal()
         
+        # Cursor de la próxima página de cada panel
+        self.cursors = {}
+        
+        # Las consultas de los listados corren en un thread aparte y sus
+        # resultados vuelven al thread de Tk por una cola (ver process_ui_results)
+        self.db_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ui-db")
+        self.ui_results = queue.Queue()
+        self.loading = set()
+        self.reload_requested = set()
+        # Filas mostradas por panel: iid (id de reserva) -> updated_at
+        self.row_versions = {panel_type: {} for panel_type in PANELS}
+        
+        # Versión del contador de notificaciones ya mostrada en el badge
+        self.notifications_version = None
+        
+        # Feed en vivo del servidor: el thread del feed encola y Tk lo consume
+        self.feed_events = queue.Queue()
+        self.feed = FeedSubscriber(
+            settings.event_feed_url,
+            lambda *event: self.feed_events.put(event),
+            api_key=settings.admin_api_key
+        )
+        self.feed_connected = False
+        
         # Configurar estilo
         self.setup_styles()
         
@@ -39,8 +82,9 @@ class MainWindow:
         self.create_main_content()
         self.create_status_bar()
         
-        # Actualizar notificaciones cada 5 segundos
+        # Actualizar con los eventos del feed (o cada 5 segundos sin servidor)
         self.update_notifications()
+        self.process_ui_results()
         
     def setup_styles(self):
         """Configurar estilos de la aplicación"""
@@ -168,9 +212,27 @@ class MainWindow:
         tree.column("Personas", width=80)
         tree.column("Estado", width=100)
         
-        # Scrollbar
+        # Botón "Cargar más": agrega la página siguiente al final del panel
+        more_frame = tk.Frame(frame, bg="white")
+        more_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10)
+        more_btn = tk.Button(
+            more_frame,
+            text="⬇️ Cargar más",
+            cursor="hand2",
+            command=lambda: self.load_reservations(panel_type, append=True)
+        )
+        more_btn.pack(side=tk.RIGHT)
+        setattr(self, f"{panel_type}_more_button", more_btn)
+        
+        # Scrollbar: al acercarse al final se carga la página siguiente
         scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=tree.yview)
-        tree.configure(yscroll=scrollbar.set)
+        
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            if float(last) >= LOAD_MORE_AT and self.cursors.get(panel_type):
+                self.load_reservations(panel_type, append=True)
+        
+        tree.configure(yscrollcommand=on_scroll)
         
         tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10, pady=10)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=10)
@@ -222,83 +284,168 @@ class MainWindow:
         )
         self.status_label.pack(side=tk.LEFT, padx=10)
         
-    def load_reservations(self, panel_type):
+    def load_reservations(self, panel_type, append=False):
         """
-        Cargar reservas en el panel correspondiente.
+        Cargar reservas en el panel correspondiente, en segundo plano.
+        Sin append vuelve a leer lo ya cargado y aplica solo las diferencias;
+        con append agrega la página siguiente.
         """
-        tree = getattr(self, f"{panel_type}_tree")
+        if panel_type in self.loading:
+            if not append:
+                self.reload_requested.add(panel_type)
+            return
         
-        # Limpiar tree
-        for item in tree.get_children():
-            tree.delete(item)
+        if append:
+            cursor = self.cursors.get(panel_type)
+            if cursor is None:
+                return
+            limit = PAGE_SIZE
+        else:
+            cursor = None
+            limit = max(PAGE_SIZE, len(self.row_versions[panel_type]))
         
-        # Obtener reservas según el tipo
-        if panel_type == "pending":
-            reservations = ReservationService.get_pending_reservations(self.db)
-        elif panel_type == "confirmed":
-            reservations = ReservationService.get_confirmed_reservations(self.db)
-        else:  # history
-            reservations = ReservationService.get_all_reservations(self.db)
-        
-        # Insertar reservas en el tree
-        for res in reservations:
-            date_str = res.reservation_date.strftime("%d/%m/%Y") if res.reservation_date else "N/A"
-            time_str = res.reservation_time or "N/A"
-            party_size_str = str(res.party_size) if res.party_size else "N/A"
+        self.loading.add(panel_type)
+        future = self.db_worker.submit(self.fetch_rows, panel_type, limit, cursor)
+        future.add_done_callback(lambda done: self.ui_results.put((panel_type, append, done)))
+    
+    @staticmethod
+    def fetch_rows(panel_type, limit, cursor):
+        """
+        Consulta una página en el thread de la BD y la devuelve como filas
+        planas (iid, updated_at, valores) para no tocar objetos ORM desde Tk.
+        Cada consulta usa una sesión nueva para leer siempre datos frescos.
+        """
+        db = SessionLocal()
+        try:
+            if panel_type == "pending":
+                page = ReservationService.get_pending_page(db, limit, cursor)
+            elif panel_type == "confirmed":
+                page = ReservationService.get_confirmed_page(db, limit, cursor)
+            else:  # history
+                page = ReservationService.get_all_page(db, limit, cursor)
             
-            tree.insert("", tk.END, values=(
-                res.id,
-                res.platform.value,
-                res.customer_name or res.customer_id,
-                date_str,
-                time_str,
-                party_size_str,
-                res.status.value
-            ))
+            rows = []
+            for res in page.items:
+                date_str = res.reservation_date.strftime("%d/%m/%Y") if res.reservation_date else "N/A"
+                time_str = res.reservation_time or "N/A"
+                party_size_str = str(res.party_size) if res.party_size else "N/A"
+                rows.append((str(res.id), res.updated_at, (
+                    res.id,
+                    res.platform.value,
+                    res.customer_name or res.customer_id,
+                    date_str,
+                    time_str,
+                    party_size_str,
+                    res.status.value
+                )))
+            return rows, page.next_cursor
+        finally:
+            db.close()
     
-    def accept_reservation(self, tree):
-        """Aceptar una reserva seleccionada"""
-        selected = tree.selection()
-        if not selected:
-            messagebox.showwarning("Advertencia", "Selecciona una reserva primero")
-            return
-        
-        item = tree.item(selected[0])
-        reservation_id = item['values'][0]
-        
-        # Confirmar acción
-        if messagebox.askyesno("Confirmar", "¿Aceptar esta reserva?"):
-            ReservationService.update_reservation_status(
-                self.db,
-                reservation_id,
-                ReservationStatus.CONFIRMED
-            )
+    def process_ui_results(self):
+        """Aplicar en el thread de Tk los resultados de las consultas en segundo plano"""
+        while True:
+            try:
+                panel_type, append, future = self.ui_results.get_nowait()
+            except queue.Empty:
+                break
+            self.loading.discard(panel_type)
             
-            self.status_label.config(text=f"Reserva #{reservation_id} aceptada")
-            self.refresh_data()
-            messagebox.showinfo("Éxito", "Reserva aceptada correctamente")
+            try:
+                rows, next_cursor = future.result()
+            except Exception as e:
+                self.status_label.config(text=f"Error al cargar reservas: {e}")
+                continue
+            
+            if append:
+                self.append_rows(panel_type, rows)
+            else:
+                self.apply_rows(panel_type, rows)
+                self.status_label.config(text="Datos actualizados")
+            
+            self.cursors[panel_type] = next_cursor
+            more_btn = getattr(self, f"{panel_type}_more_button")
+            more_btn.config(state=tk.NORMAL if next_cursor else tk.DISABLED)
+            
+            if panel_type in self.reload_requested:
+                self.reload_requested.discard(panel_type)
+                self.load_reservations(panel_type)
+        
+        self.root.after(UI_RESULTS_MS, self.process_ui_results)
     
-    def reject_reservation(self, tree):
-        """Rechazar una reserva seleccionada"""
+    def apply_rows(self, panel_type, rows):
+        """
+        Dejar el panel igual a rows tocando solo lo que cambió: borra las
+        reservas que ya no están, inserta las nuevas, actualiza las que
+        cambiaron de updated_at y reordena las que se movieron.
+        """
+        tree = getattr(self, f"{panel_type}_tree")
+        versions = self.row_versions[panel_type]
+        
+        keep = {iid for iid, _, _ in rows}
+        for iid in [iid for iid in versions if iid not in keep]:
+            tree.delete(iid)
+            del versions[iid]
+        
+        children = list(tree.get_children())
+        for index, (iid, updated_at, values) in enumerate(rows):
+            if iid not in versions:
+                tree.insert("", index, iid=iid, values=values)
+                children.insert(index, iid)
+            else:
+                if versions[iid] != updated_at:
+                    tree.item(iid, values=values)
+                if children[index] != iid:
+                    tree.move(iid, "", index)
+                    children.remove(iid)
+                    children.insert(index, iid)
+            versions[iid] = updated_at
+    
+    def append_rows(self, panel_type, rows):
+        """Agregar una página al final del panel"""
+        tree = getattr(self, f"{panel_type}_tree")
+        versions = self.row_versions[panel_type]
+        for iid, updated_at, values in rows:
+            if iid in versions:
+                if versions[iid] != updated_at:
+                    tree.item(iid, values=values)
+            else:
+                tree.insert("", tk.END, iid=iid, values=values)
+            versions[iid] = updated_at
+    
+    def change_selected_status(self, tree, new_status, verb, done):
+        """Cambiar el estado de todas las reservas seleccionadas en una transacción"""
         selected = tree.selection()
         if not selected:
             messagebox.showwarning("Advertencia", "Selecciona una reserva primero")
             return
         
-        item = tree.item(selected[0])
-        reservation_id = item['values'][0]
+        reservation_ids = [tree.item(iid)['values'][0] for iid in selected]
+        question = f"¿{verb.capitalize()} esta reserva?" if len(reservation_ids) == 1 else f"¿{verb.capitalize()} {len(reservation_ids)} reservas?"
         
         # Confirmar acción
-        if messagebox.askyesno("Confirmar", "¿Rechazar esta reserva?"):
-            ReservationService.update_reservation_status(
-                self.db,
-                reservation_id,
-                ReservationStatus.REJECTED
-            )
+        if messagebox.askyesno("Confirmar", question):
+            results = ReservationService.bulk_update_status(self.db, reservation_ids, new_status)
+            updated = sum(1 for outcome in results.values() if outcome == BULK_UPDATED)
+            skipped = len(results) - updated
             
-            self.status_label.config(text=f"Reserva #{reservation_id} rechazada")
+            if len(reservation_ids) == 1:
+                self.status_label.config(text=f"Reserva #{reservation_ids[0]} {done}")
+            else:
+                self.status_label.config(text=f"{updated} reservas {done}s")
             self.refresh_data()
-            messagebox.showinfo("Éxito", "Reserva rechazada correctamente")
+            if skipped:
+                messagebox.showwarning("Aviso", f"{skipped} reserva(s) ya no estaban pendientes")
+            else:
+                messagebox.showinfo("Éxito", f"Reserva(s) {done}(s) correctamente")
+    
+    def accept_reservation(self, tree):
+        """Aceptar las reservas seleccionadas"""
+        self.change_selected_status(tree, ReservationStatus.CONFIRMED, "aceptar", "aceptada")
+    
+    def reject_reservation(self, tree):
+        """Rechazar las reservas seleccionadas"""
+        self.change_selected_status(tree, ReservationStatus.REJECTED, "rechazar", "rechazada")
     
     def show_notifications(self):
         """Mostrar ventana de notificaciones"""
@@ -331,29 +478,59 @@ class MainWindow:
     def mark_all_read(self, window):
         """Marcar todas las notificaciones como leídas"""
         NotificationService.mark_all_as_read(self.db)
-        self.update_notifications()
+        self.refresh_notification_badge()
         window.destroy()
         messagebox.showinfo("Éxito", "Notificaciones marcadas como leídas")
     
-    def update_notifications(self):
-        """Actualizar contador de notificaciones"""
-        count = NotificationService.get_unread_count(self.db)
+    def refresh_notification_badge(self):
+        """Actualizar el badge si el contador cambió desde la última vez"""
+        count, version = NotificationService.get_unread_state(self.db)
+        if version == self.notifications_version:
+            return
+        self.notifications_version = version
         
         if count > 0:
             self.notification_badge.config(text=str(count))
             self.notification_badge.pack()
         else:
             self.notification_badge.pack_forget()
+    
+    def update_notifications(self):
+        """
+        Aplicar los eventos recibidos del feed. Sin conexión al servidor se
+        vuelve a consultar la base de datos cada 5 segundos.
+        """
+        reservations_changed = notifications_changed = False
+        while True:
+            try:
+                _, event_type, _ = self.feed_events.get_nowait()
+            except queue.Empty:
+                break
+            if event_type in (NOTIFICATION_CREATED, NOTIFICATIONS_READ):
+                notifications_changed = True
+            else:
+                # Eventos de reservas y feed.reset
+                reservations_changed = True
+                notifications_changed = True
+        
+        connected = self.feed.connected
+        if connected and not self.feed_connected:
+            # Lo ocurrido antes de suscribirse no llega por el feed
+            reservations_changed = notifications_changed = True
+        self.feed_connected = connected
+        
+        if reservations_changed:
+            self.refresh_data()
+        if notifications_changed or not connected:
+            self.refresh_notification_badge()
         
         # Programar próxima actualización
-        self.root.after(5000, self.update_notifications)
+        self.root.after(FEED_CHECK_MS if connected else FALLBACK_POLL_MS, self.update_notifications)
     
     def refresh_data(self):
         """Refrescar datos de todos los paneles"""
-        self.load_reservations("pending")
-        self.load_reservations("confirmed")
-        self.load_reservations("history")
-        self.status_label.config(text="Datos actualizados")
+        for panel_type in PANELS:
+            self.load_reservations(panel_type)
     
     def show_panel(self, panel_type):
         """Cambiar a un panel específico"""
@@ -363,6 +540,8 @@ class MainWindow:
     def on_closing(self):
         """Cerrar aplicación"""
         if messagebox.askokcancel("Salir", "¿Deseas cerrar la aplicación?"):
+            self.feed.stop()
+            self.db_worker.shutdown(wait=False, cancel_futures=True)
             self.db.close()
             self.root.destroy()
     
@@ -370,6 +549,7 @@ class MainWindow:
         """Iniciar la aplicación"""
         # Cargar datos iniciales
         self.refresh_data()
+        self.feed.start()
         
         # Configurar evento de cierre
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
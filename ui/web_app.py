@@ -6,36 +6,121 @@ import os
 # Añadir root al path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from database import SessionLocal, init_db
-from database.models import ReservationStatus, Platform
-from services.reservation_service import ReservationService
-from services.notification_service import NotificationService
+from database.models import ReservationStatus
+from ui.dashboard_data import ensure_db, load_page, set_status
+from utils.feed_client import FeedSubscriber
+from config import settings
 
-def get_db():
-    if 'db' not in st.session_state:
-        init_db()
-        st.session_state.db = SessionLocal()
-    return st.session_state.db
+# Filas por página en los listados (paginación por cursor)
+PAGE_SIZE = 50
+
+@st.cache_resource
+def get_feed():
+    """Suscripción al feed en vivo, compartida por todas las sesiones."""
+    feed = FeedSubscriber(settings.event_feed_url, api_key=settings.admin_api_key)
+    feed.start()
+    return feed
+
+def get_page(key, feed_version):
+    """
+    Página actual de un listado como DataFrame (cacheado). En session_state
+    se guarda la pila de cursores visitados para volver a la página anterior.
+    """
+    cursors = st.session_state.setdefault(f"{key}_cursors", [None])
+    frame, next_cursor = load_page(key, PAGE_SIZE, cursors[-1], feed_version)
+
+    col_prev, col_next = st.columns(2)
+    if len(cursors) > 1 and col_prev.button("⬅️ Anterior", key=f"{key}_prev"):
+        cursors.pop()
+        st.rerun()
+    if next_cursor and col_next.button("Siguiente ➡️", key=f"{key}_next"):
+        cursors.append(next_cursor)
+        st.rerun()
+    return frame
+
+def apply_status(reservation_ids, new_status, label):
+    """Cambiar el estado de las reservas elegidas en un solo rerun."""
+    updated = set_status(reservation_ids, new_status)
+    st.session_state.flash = f"{updated} reserva(s) {label}"
+    st.session_state.pending_selected = set()
+    # Editor nuevo: la selección anterior no debe aplicarse a otras filas
+    st.session_state.pending_editor_rev = st.session_state.get("pending_editor_rev", 0) + 1
+    st.rerun()
+
+def wait_for_changes(feed, seen_id):
+    """
+    Con el feed conectado, deja la página esperando el próximo evento y
+    recién entonces vuelve a ejecutar el script (y a consultar la BD).
+    El placeholder se actualiza cada segundo para que un clic del usuario
+    pueda interrumpir la espera.
+    """
+    status = st.empty()
+    if not feed.connected:
+        status.caption("⚪ Sin conexión al servidor: los datos se actualizan al interactuar")
+        return
+    while not feed.wait_for_event(seen_id, 1.0):
+        if not feed.connected:
+            status.caption("⚪ Sin conexión al servidor: los datos se actualizan al interactuar")
+            return
+        status.caption("🟢 En vivo")
+    st.rerun()
 
 def main():
-    db = get_db()
+    ensure_db()
+    feed = get_feed()
+    seen_id = feed.last_event_id
+    # Con feed, cada evento invalida los listados cacheados; sin él, rige el TTL
+    feed_version = seen_id if feed.connected else None
     st.title("📱 ReservaMaster")
-    
+
+    flash = st.session_state.pop("flash", None)
+    if flash:
+        st.success(flash)
+
     tab1, tab2 = st.tabs(["📝 Pendientes", "✅ Confirmadas"])
-    
+
     with tab1:
-        pending = ReservationService.get_pending_reservations(db)
-        for res in pending:
-            st.write(f"**{res.customer_name}** - {res.platform.value}")
-            if st.button("Aceptar", key=f"acc_{res.id}"):
-                ReservationService.update_reservation_status(db, res.id, ReservationStatus.CONFIRMED)
-                st.rerun()
+        pending = get_page("pending", feed_version)
+        if pending.empty:
+            st.info("No hay reservas pendientes")
+        else:
+            # La selección se guarda por ID para sobrevivir a los refrescos del feed
+            previous = st.session_state.get("pending_selected", set())
+            view = pd.DataFrame({
+                "Seleccionar": pending["id"].isin(previous),
+                "ID": pending["id"],
+                "Cliente": pending["customer_name"].fillna(pending["customer_id"]),
+                "Plataforma": pending["platform"],
+                "Fecha": pd.to_datetime(pending["reservation_date"]).dt.strftime("%d/%m/%Y"),
+                "Hora": pending["reservation_time"],
+                "Personas": pending["party_size"],
+            })
+            edited = st.data_editor(
+                view,
+                column_config={"Seleccionar": st.column_config.CheckboxColumn("✔")},
+                disabled=[column for column in view.columns if column != "Seleccionar"],
+                hide_index=True,
+                key=f"pending_editor_{st.session_state.get('pending_editor_rev', 0)}_{feed_version}"
+            )
+            selected = edited.loc[edited["Seleccionar"], "ID"].tolist()
+            st.session_state.pending_selected = set(selected)
+
+            col_accept, col_reject = st.columns(2)
+            if col_accept.button(f"Aceptar seleccionadas ({len(selected)})", disabled=not selected):
+                apply_status(selected, ReservationStatus.CONFIRMED, "aceptada(s)")
+            if col_reject.button(f"Rechazar seleccionadas ({len(selected)})", disabled=not selected):
+                apply_status(selected, ReservationStatus.REJECTED, "rechazada(s)")
 
     with tab2:
-        confirmed = ReservationService.get_confirmed_reservations(db)
-        if confirmed:
-            data = [{"Cliente": r.customer_name, "Plataforma": r.platform.value} for r in confirmed]
-            st.dataframe(pd.DataFrame(data))
+        confirmed = get_page("confirmed", feed_version)
+        if not confirmed.empty:
+            data = pd.DataFrame({
+                "Cliente": confirmed["customer_name"],
+                "Plataforma": confirmed["platform"]
+            })
+            st.dataframe(data)
+
+    wait_for_changes(feed, seen_id)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,44 @@
+"""
+Autenticación de los endpoints internos (exportación, gestión de reservas y
+feed en vivo). Van en la misma app que los webhooks, expuesta por el túnel,
+así que exigen la clave ADMIN_API_KEY en el header X-Admin-Key.
+"""
+import hmac
+from typing import Optional
+from fastapi import Header, HTTPException, status
+from config import settings
+from utils.logger import app_logger
+
+ADMIN_KEY_HEADER = "X-Admin-Key"
+
+
+def is_valid_admin_key(key: Optional[str]) -> bool:
+    """
+    Compara la clave recibida con ADMIN_API_KEY.
+    Sin clave configurada no se acepta ninguna.
+    """
+    if not settings.admin_api_key or not key:
+        return False
+    # Comparación segura contra timing attacks
+    return hmac.compare_digest(key.encode("utf-8"), settings.admin_api_key.encode("utf-8"))
+
+
+async def require_admin_key(x_admin_key: Optional[str] = Header(None, alias=ADMIN_KEY_HEADER)) -> None:
+    """
+    Dependency de FastAPI para los routers internos.
+
+    Raises:
+        HTTPException: 503 si ADMIN_API_KEY no está configurada, 401 si la clave no es válida
+    """
+    if not settings.admin_api_key:
+        app_logger.warning("Endpoint interno rechazado: ADMIN_API_KEY no está configurada")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="ADMIN_API_KEY no configurada"
+        )
+    if not is_valid_admin_key(x_admin_key):
+        app_logger.warning("Endpoint interno: clave de administración inválida")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Clave de administración inválida"
+        )
@@ -1,176 +1,264 @@
 """
 Extractor de entidades de mensajes usando regex y NLP básico.
 Detecta fechas, horas y cantidad de personas en texto natural.
+
+El texto se pasa a minúsculas una vez y se recorre con una única expresión
+regular precompilada, guardando la primera coincidencia de cada regla. Luego las
+reglas se resuelven con la misma prioridad que antes: una regla cuya primera
+coincidencia es inválida cede el paso a la siguiente.
 """
 import re
+import sys
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from itertools import repeat
+from typing import Optional, Dict, Any, Iterable, List
 from utils.logger import app_logger
 
 
+# Todas las reglas giran alrededor de un número: el escaneo consume la palabra
+# clave opcional y el número, y mira lo que le sigue dentro de un lookahead para
+# no tapar números posteriores (p. ej. "25:30pm" o "para 4 personas 21:00").
+_ENTITY_PATTERN = re.compile(
+    r"(?:(?P<keyword>mesa\s*para|para|somos)\s*(?P<keyword_number>\d+)|(?P<number>\d+))"
+    r"(?=(?P<persons>\s*personas?)"
+    r"|(?P<diners>\s*comensales?)"
+    r"|(?P<clock>:(?P<minute>\d{2}))"
+    r"|(?P<meridiem>\s*(?:pm|am))"
+    r"|(?P<period>\s*de\s*la\s*(?P<period_name>tarde|noche|mañana))"
+    r"|(?P<numeric_date>[/-](?P<month>\d{1,2})[/-](?P<year>\d{4}))"
+    r")?"
+)
+
+# Reglas de party size que cumple cada palabra clave delante del número
+_KEYWORD_RULES = {
+    "para": ("para",),
+    "somos": ("somos",),
+}
+_MESA_PARA_RULES = ("mesa", "para")  # "mesa para N" también es "para N"
+
+# Reglas de hora y fecha, que empiezan con \d{1,2}
+_HOUR_DAY_RULES = {"clock", "meridiem", "period", "numeric_date"}
+
+
 class EntityExtractor:
 
-    PARTY_SIZE_PATTERNS = [
-        r'(\d+)\s*personas?',
-        r'para\s*(\d+)',
-        r'somos\s*(\d+)',
-        r'mesa\s*para\s*(\d+)',
-        r'(\d+)\s*comensales?'
-    ]
-    
-    TIME_PATTERNS = [
-        r'(\d{1,2}):(\d{2})',  # 20:00, 8:30
-        r'(\d{1,2})\s*(?:pm|am)',  # 8pm, 9am
-        r'(\d{1,2})\s*de\s*la\s*(?:tarde|noche|mañana)',  # 8 de la noche
-    ]
-    
+    # Reglas de cantidad de personas en orden de prioridad
+    PARTY_SIZE_RULES = ["persons", "para", "somos", "mesa", "diners"]
+
     DATE_KEYWORDS = {
         'hoy': 0,
         'mañana': 1,
         'pasado mañana': 2,
         'pasado': 2
     }
-    
+
+    @staticmethod
+    def _scan(text_lower: str) -> Dict[str, Any]:
+        """
+        Recorre el texto una vez y devuelve la primera coincidencia de cada regla.
+
+        Las reglas de party size guardan el número completo. Las de hora y fecha
+        guardan (últimas dos cifras, coincidencia): re.search con \\d{1,2}
+        encontraba "20pm" dentro de "120pm".
+        """
+        found: Dict[str, Any] = {}
+        for match in _ENTITY_PATTERN.finditer(text_lower):
+            keyword = match.group("keyword")
+            if keyword:
+                number = match.group("keyword_number")
+                rules = _MESA_PARA_RULES if keyword.startswith("mesa") else _KEYWORD_RULES[keyword]
+                for rule in rules:
+                    found.setdefault(rule, number)
+            else:
+                number = match.group("number")
+
+            rule = match.lastgroup
+            if rule == "persons" or rule == "diners":
+                found.setdefault(rule, number)
+            elif rule in _HOUR_DAY_RULES:
+                found.setdefault(rule, (number[-2:], match))
+        return found
+
+    @staticmethod
+    def _resolve_party_size(found: Dict[str, Any]) -> Optional[int]:
+        for rule in EntityExtractor.PARTY_SIZE_RULES:
+            number = found.get(rule)
+            if number:
+                party_size = int(number)
+                if 1 <= party_size <= 50:  # Validación razonable
+                    app_logger.debug(f"Party size extraído: {party_size}")
+                    return party_size
+        return None
+
+    @staticmethod
+    def _resolve_time(found: Dict[str, Any], text_lower: str) -> Optional[str]:
+        # Patrón HH:MM
+        if "clock" in found:
+            number, match = found["clock"]
+            hour = int(number)
+            minute = int(match.group("minute"))
+            if 0 <= hour <= 23 and 0 <= minute <= 59:
+                return f"{hour:02d}:{minute:02d}"
+
+        # Patrón con PM/AM
+        if "meridiem" in found:
+            hour = int(found["meridiem"][0])
+            is_pm = 'pm' in text_lower
+
+            if is_pm and hour != 12:
+                hour += 12
+            elif not is_pm and hour == 12:
+                hour = 0
+
+            if 0 <= hour <= 23:
+                return f"{hour:02d}:00"
+
+        # Patrón "X de la tarde/noche/mañana"
+        if "period" in found:
+            number, match = found["period"]
+            hour = int(number)
+            period = match.group("period_name")
+
+            if period in ('tarde', 'noche') and hour < 12:
+                hour += 12
+
+            if 0 <= hour <= 23:
+                return f"{hour:02d}:00"
+
+        return None
+
+    @staticmethod
+    def _resolve_date(found: Dict[str, Any], text_lower: str, now: Optional[datetime] = None) -> Optional[datetime]:
+        # Palabras clave relativas
+        for keyword, days_offset in EntityExtractor.DATE_KEYWORDS.items():
+            if keyword in text_lower:
+                target_date = (now or datetime.now()) + timedelta(days=days_offset)
+                app_logger.debug(f"Fecha extraída: {target_date.date()} (keyword: {keyword})")
+                return target_date
+
+        # Formato DD/MM/YYYY o DD-MM-YYYY
+        if "numeric_date" in found:
+            number, match = found["numeric_date"]
+            try:
+                target_date = datetime(int(match.group("year")), int(match.group("month")), int(number))
+                app_logger.debug(f"Fecha extraída: {target_date.date()}")
+                return target_date
+            except ValueError:
+                pass
+
+        return None
+
     @staticmethod
     def extract_party_size(text: str) -> Optional[int]:
         """
         Extrae la cantidad de personas del texto.
-        
+
         Ejemplos:
             "para 4 personas" -> 4
             "somos 2" -> 2
             "mesa para 6" -> 6
-        
+
         Args:
             text: Texto del mensaje
-            
+
         Returns:
             Cantidad de personas o None si no se encuentra
         """
-        text_lower = text.lower()
-        
-        for pattern in EntityExtractor.PARTY_SIZE_PATTERNS:
-            match = re.search(pattern, text_lower)
-            if match:
-                try:
-                    party_size = int(match.group(1))
-                    if 1 <= party_size <= 50:  # Validación razonable
-                        app_logger.debug(f"Party size extraído: {party_size}")
-                        return party_size
-                except (ValueError, IndexError):
-                    continue
-        
-        return None
-    
+        return EntityExtractor._resolve_party_size(EntityExtractor._scan(text.lower()))
+
     @staticmethod
     def extract_time(text: str) -> Optional[str]:
         """
         Extrae la hora del texto y la normaliza a formato HH:MM.
-        
+
         Ejemplos:
             "a las 20:00" -> "20:00"
             "8pm" -> "20:00"
             "8 de la noche" -> "20:00"
-        
+
         Args:
             text: Texto del mensaje
-            
+
         Returns:
             Hora en formato HH:MM o None si no se encuentra
         """
         text_lower = text.lower()
-        
-        # Patrón HH:MM
-        match = re.search(r'(\d{1,2}):(\d{2})', text_lower)
-        if match:
-            hour = int(match.group(1))
-            minute = int(match.group(2))
-            if 0 <= hour <= 23 and 0 <= minute <= 59:
-                return f"{hour:02d}:{minute:02d}"
-        
-        # Patrón con PM/AM
-        match = re.search(r'(\d{1,2})\s*(?:pm|am)', text_lower)
-        if match:
-            hour = int(match.group(1))
-            is_pm = 'pm' in text_lower
-            
-            if is_pm and hour != 12:
-                hour += 12
-            elif not is_pm and hour == 12:
-                hour = 0
-            
-            if 0 <= hour <= 23:
-                return f"{hour:02d}:00"
-        
-        # Patrón "X de la tarde/noche/mañana"
-        match = re.search(r'(\d{1,2})\s*de\s*la\s*(tarde|noche|mañana)', text_lower)
-        if match:
-            hour = int(match.group(1))
-            period = match.group(2)
-            
-            if period == 'tarde' and hour < 12:
-                hour += 12
-            elif period == 'noche' and hour < 12:
-                hour += 12
-            
-            if 0 <= hour <= 23:
-                return f"{hour:02d}:00"
-        
-        return None
-    
+        return EntityExtractor._resolve_time(EntityExtractor._scan(text_lower), text_lower)
+
     @staticmethod
     def extract_date(text: str) -> Optional[datetime]:
         """
         Extrae la fecha del texto.
-        
+
         Ejemplos:
             "hoy" -> fecha de hoy
             "mañana" -> fecha de mañana
             "15/01/2026" -> 2026-01-15
-        
+
         Args:
             text: Texto del mensaje
-            
+
         Returns:
             Objeto datetime o None si no se encuentra
         """
         text_lower = text.lower()
-        
-        # Buscar palabras clave relativas
-        for keyword, days_offset in EntityExtractor.DATE_KEYWORDS.items():
-            if keyword in text_lower:
-                target_date = datetime.now() + timedelta(days=days_offset)
-                app_logger.debug(f"Fecha extraída: {target_date.date()} (keyword: {keyword})")
-                return target_date
-        
-        # Buscar formato DD/MM/YYYY o DD-MM-YYYY
-        match = re.search(r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})', text_lower)
-        if match:
-            try:
-                day = int(match.group(1))
-                month = int(match.group(2))
-                year = int(match.group(3))
-                target_date = datetime(year, month, day)
-                app_logger.debug(f"Fecha extraída: {target_date.date()}")
-                return target_date
-            except ValueError:
-                pass
-        
-        return None
-    
+        return EntityExtractor._resolve_date(EntityExtractor._scan(text_lower), text_lower)
+
     @staticmethod
     def extract_all(text: str) -> Dict[str, Any]:
         """
-        Extrae todas las entidades del texto.
-        
+        Extrae todas las entidades del texto con un único escaneo.
+
         Args:
             text: Texto del mensaje
-            
+
         Returns:
             Diccionario con las entidades extraídas
         """
+        text_lower = text.lower()
+        found = EntityExtractor._scan(text_lower)
         return {
-            "party_size": EntityExtractor.extract_party_size(text),
-            "time": EntityExtractor.extract_time(text),
-            "date": EntityExtractor.extract_date(text)
-        }
\ No newline at end of file
+            "party_size": EntityExtractor._resolve_party_size(found),
+            "time": EntityExtractor._resolve_time(found, text_lower),
+            "date": EntityExtractor._resolve_date(found, text_lower)
+        }
+
+    @staticmethod
+    def extract_batch(texts: Iterable[str], reference_times: Optional[Iterable[datetime]] = None):
+        """
+        Extrae las entidades de muchos textos y devuelve el resultado por columnas.
+
+        Pensado para reprocesar el historial: las fechas relativas ("mañana")
+        se calculan a partir de reference_times (p. ej. el timestamp de cada
+        mensaje) en lugar de la hora actual.
+
+        Args:
+            texts: Iterable o pandas Series de textos (None/NaN se aceptan)
+            reference_times: Iterable alineado con texts; por defecto, ahora
+
+        Returns:
+            {"party_size": [...], "time": [...], "date": [...]}, o un
+            DataFrame con el mismo índice si texts es una pandas Series
+        """
+        columns: Dict[str, List[Any]] = {"party_size": [], "time": [], "date": []}
+        party_sizes, times, dates = columns["party_size"], columns["time"], columns["date"]
+        if reference_times is None:
+            reference_times = repeat(datetime.now())
+
+        for text, now in zip(texts, reference_times):
+            if not isinstance(text, str):
+                party_sizes.append(None)
+                times.append(None)
+                dates.append(None)
+                continue
+            text_lower = text.lower()
+            found = EntityExtractor._scan(text_lower)
+            party_sizes.append(EntityExtractor._resolve_party_size(found))
+            times.append(EntityExtractor._resolve_time(found, text_lower))
+            dates.append(EntityExtractor._resolve_date(found, text_lower, now))
+
+        # pandas es opcional: si no está importado, texts no puede ser una Series
+        pd = sys.modules.get("pandas")
+        if pd is not None and isinstance(texts, pd.Series):
+            return pd.DataFrame(columns, index=texts.index)
+        return columns
@@ -0,0 +1,87 @@
+"""
+Índice invertido de preguntas frecuentes.
+Se construye una vez al cargar la base de conocimientos: token -> FAQs, con
+pesos IDF, para responder cada mensaje con una sola tokenización.
+"""
+import heapq
+import math
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from utils.intent_matcher import fold_text
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Conectores frecuentes que no aportan significado a la búsqueda
+STOPWORDS = {
+    "para", "como", "cual", "cuales", "esta", "estan", "este", "tienen", "tiene",
+    "puedo", "pueden", "hacer", "hay", "algun", "alguna", "donde", "cuando", "quiero",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokeniza un texto para el índice: sin acentos, sin conectores y con una
+    raíz simple que unifica género y número ("veganas", "vegano" -> "vegan").
+    """
+    tokens = []
+    for token in _TOKEN_RE.findall(fold_text(text)):
+        if len(token) <= 3 or token in STOPWORDS:
+            continue
+        if len(token) > 4 and token[-1] == "s":
+            token = token[:-1]
+        if len(token) > 4 and token[-1] in "aeo":
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class FAQIndex:
+    """
+    Índice invertido con puntuación IDF.
+    La puntuación de una FAQ es la fracción del peso IDF de su pregunta que
+    aparece en el mensaje (0..1).
+    """
+
+    def __init__(self, faqs: List[Dict]):
+        self.faqs = [faq for faq in faqs if faq.get("answer")]
+        postings: Dict[str, List[int]] = defaultdict(list)
+        faq_tokens: List[set] = []
+        for faq_id, faq in enumerate(self.faqs):
+            tokens = set(tokenize(faq.get("question", "")))
+            faq_tokens.append(tokens)
+            for token in tokens:
+                postings[token].append(faq_id)
+
+        total = len(self.faqs)
+        self.postings = dict(postings)
+        self.idf = {token: math.log(1 + total / len(ids)) for token, ids in self.postings.items()}
+        self.norms = [sum(self.idf[t] for t in tokens) for tokens in faq_tokens]
+
+    def search(self, text: str, k: int = 3) -> List[Tuple[float, Dict]]:
+        """
+        Devuelve las `k` FAQs con mayor puntuación para el texto.
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        for token in set(tokenize(text)):
+            weight = self.idf.get(token)
+            if weight is None:
+                continue
+            for faq_id in self.postings[token]:
+                scores[faq_id] += weight
+
+        top = heapq.nlargest(k, ((score / self.norms[faq_id], faq_id) for faq_id, score in scores.items()))
+        return [(round(score, 3), self.faqs[faq_id]) for score, faq_id in top]
+
+    def best_answer(self, text: str, min_score: float) -> Optional[str]:
+        """
+        Respuesta de la mejor FAQ si supera el umbral de confianza.
+        """
+        results = self.search(text, k=1)
+        if results and results[0][0] >= min_score:
+            return results[0][1].get("answer")
+        return None
+
+    def __len__(self) -> int:
+        return len(self.faqs)
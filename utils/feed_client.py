@@ -0,0 +1,93 @@
+"""
+Cliente del feed en vivo (SSE) para la app desktop y el dashboard.
+Corre en un thread daemon, se reconecta solo y reanuda con Last-Event-ID.
+"""
+import json
+import threading
+from typing import Any, Callable, Dict, Optional
+import httpx
+from utils.admin_auth import ADMIN_KEY_HEADER
+from utils.logger import app_logger
+
+FeedCallback = Callable[[int, str, Dict[str, Any]], None]
+
+
+class FeedSubscriber(threading.Thread):
+    """
+    Suscriptor SSE. on_event(id, tipo, datos) se llama desde este thread:
+    las UIs deben pasar el evento a su propio thread (p. ej. con una cola),
+    o bien esperar cambios con wait_for_event.
+    connected indica si hay stream abierto; mientras sea False las UIs
+    vuelven a consultar la base de datos periódicamente.
+    api_key es la clave ADMIN_API_KEY que exige el servidor.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        on_event: Optional[FeedCallback] = None,
+        reconnect_delay: float = 3.0,
+        api_key: Optional[str] = None
+    ):
+        super().__init__(name="feed-subscriber", daemon=True)
+        self.url = url
+        self.api_key = api_key
+        self.on_event = on_event
+        self.reconnect_delay = reconnect_delay
+        self.last_event_id: Optional[int] = None
+        self.connected = False
+        self._stop_event = threading.Event()
+        self._received = threading.Condition()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def wait_for_event(self, seen_id: Optional[int], timeout: float) -> bool:
+        """Espera hasta timeout a que llegue un evento posterior a seen_id."""
+        with self._received:
+            return self._received.wait_for(lambda: self.last_event_id != seen_id, timeout)
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self._consume()
+            except Exception as e:
+                app_logger.debug(f"Feed de eventos no disponible ({self.url}): {e}")
+            self.connected = False
+            self._stop_event.wait(self.reconnect_delay)
+
+    def _consume(self):
+        headers = {"Accept": "text/event-stream"}
+        if self.api_key:
+            headers[ADMIN_KEY_HEADER] = self.api_key
+        if self.last_event_id is not None:
+            headers["Last-Event-ID"] = str(self.last_event_id)
+        # Sin timeout de lectura: el servidor manda keepalive periódicos
+        timeout = httpx.Timeout(5.0, read=None)
+        with httpx.stream("GET", self.url, headers=headers, timeout=timeout) as response:
+            response.raise_for_status()
+            self.connected = True
+            event_id, event_type, data = None, "message", []
+            for line in response.iter_lines():
+                if self._stop_event.is_set():
+                    return
+                if not line:
+                    # Fin del evento
+                    if data and event_id is not None:
+                        if self.on_event is not None:
+                            self.on_event(event_id, event_type, json.loads("\n".join(data)))
+                        with self._received:
+                            self.last_event_id = event_id
+                            self._received.notify_all()
+                    event_id, event_type, data = None, "message", []
+                elif line.startswith(":"):
+                    continue  # keepalive
+                else:
+                    field, _, value = line.partition(":")
+                    value = value[1:] if value.startswith(" ") else value
+                    if field == "id":
+                        event_id = int(value)
+                    elif field == "event":
+                        event_type = value
+                    elif field == "data":
+                        data.append(value)
@@ -0,0 +1,80 @@
+"""
+Detector de intenciones por palabras clave.
+Compila todas las tablas de palabras clave en una única expresión regular con
+grupos nombrados, de modo que un mensaje se recorre una sola vez.
+"""
+import re
+import unicodedata
+from typing import Dict, FrozenSet, Iterable
+
+
+# Tablas de palabras clave por intención (se pliegan a minúsculas sin acentos).
+# Un "*" final acepta cualquier terminación de la palabra: "reserv*" cubre
+# reserva, reservamos, reservaciones, reservarles...
+INTENT_KEYWORDS: Dict[str, Iterable[str]] = {
+    "agent": ["agente", "agentes", "hablar con alguien", "ayud*", "persona"],
+    "reservation": ["reserv*", "mesa", "mesas", "turno", "turnos", "cita", "citas"],
+    "greeting": ["hola", "buenos dias", "buenas tardes", "buenas noches"],
+    "location": ["donde", "ubicacion", "ubicados", "llegar", "direccion"],
+    "schedule": ["horario", "horarios", "abren", "hora", "cuando"],
+}
+
+
+# Variantes acentuadas que acepta cada letra de una palabra clave
+_ACCENT_CLASSES = {
+    "a": "[aáàä]",
+    "e": "[eéèë]",
+    "i": "[iíìï]",
+    "o": "[oóòö]",
+    "u": "[uúùü]",
+    "n": "[nñ]",
+}
+
+
+def fold_text(text: str) -> str:
+    """
+    Normaliza un texto para comparación: minúsculas y sin acentos.
+
+    Ejemplo:
+        "¿Dónde están?" -> "¿donde estan?"
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _word_pattern(word: str) -> str:
+    """Patrón de una palabra plegada; con "*" final acepta cualquier terminación."""
+    stem, wildcard = (word[:-1], r"\w*") if word.endswith("*") else (word, "")
+    return "".join(_ACCENT_CLASSES.get(c, re.escape(c)) for c in stem) + wildcard
+
+
+def _keyword_pattern(keyword: str) -> str:
+    """Patrón de una palabra clave plegada que tolera acentos y espacios repetidos."""
+    return r"\s+".join(_word_pattern(word) for word in keyword.split())
+
+
+class IntentMatcher:
+    """
+    Autómata de intenciones construido una vez a partir de las tablas.
+    Usa límites de palabra, de modo que "hora" no coincide con "ahora",
+    y acepta las palabras clave con o sin acentos.
+    """
+
+    def __init__(self, keyword_table: Dict[str, Iterable[str]]):
+        groups = []
+        for intent, keywords in keyword_table.items():
+            folded = sorted({fold_text(k) for k in keywords}, key=len, reverse=True)
+            alternatives = "|".join(_keyword_pattern(k) for k in folded)
+            groups.append(f"(?P<{intent}>{alternatives})")
+        # El plegado de acentos va dentro del patrón: el texto solo se pasa a minúsculas
+        self.pattern = re.compile(r"(?<!\w)(?:" + "|".join(groups) + r")(?!\w)")
+
+    def match(self, text: str) -> FrozenSet[str]:
+        """
+        Devuelve todas las intenciones presentes en el texto en una sola pasada.
+        """
+        return frozenset([m.lastgroup for m in self.pattern.finditer(text.lower())])
+
+
+# Instancia global
+intent_matcher = IntentMatcher(INTENT_KEYWORDS)
@@ -4,10 +4,20 @@ Implementa verificación de firma HMAC SHA256 según documentación oficial.
 """
 import hmac
 import hashlib
-from fastapi import HTTPException, status
+from typing import Any, Dict
+from fastapi import HTTPException, Request, status
 from config import settings
 from utils.logger import app_logger
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _JSONDecodeError = orjson.JSONDecodeError
+except ImportError:  # orjson es opcional: json de la stdlib como respaldo
+    import json
+    _json_loads = json.loads
+    _JSONDecodeError = json.JSONDecodeError
+
 
 def verify_webhook_signature(payload: bytes, signature_header: str) -> bool:
     """
@@ -86,4 +96,32 @@ def verify_webhook_request(payload: bytes, signature: str) -> None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Firma de webhook inválida"
-        )
\ No newline at end of file
+        )
+
+
+async def webhook_payload(request: Request) -> Dict[str, Any]:
+    """
+    Dependency de FastAPI para los routers de webhooks.
+    
+    Lee el cuerpo una sola vez, verifica X-Hub-Signature-256 sobre esos
+    mismos bytes y los parsea con orjson (sin decodificar a str antes).
+    
+    Raises:
+        HTTPException: 403 si la firma no es válida, 400 si el JSON no lo es
+    """
+    body = await request.body()
+    if settings.webhook_verify_signature:
+        verify_webhook_request(body, request.headers.get("X-Hub-Signature-256"))
+    try:
+        data = _json_loads(body)
+    except _JSONDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cuerpo JSON inválido"
+        )
+    if not isinstance(data, dict):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Se esperaba un objeto JSON"
+        )
+    return data
\ No newline at end of file